@@ -125,11 +125,14 @@ DATABASES = {
     }
 }
 
+# fetch queue: pulling original feeds, short and I/O bound. Started by run_huey
 HUEY = {
     "huey_class": "huey.SqliteHuey",
     "filename": DATA_FOLDER / "tasks.sqlite3",
     "consumer": {
-        "workers": int(os.environ.get("HUEY_WORKERS", 3)),
+        "workers": int(
+            os.environ.get("HUEY_FETCH_WORKERS", os.environ.get("HUEY_WORKERS", 3))
+        ),
         "worker_type": "greenlet",
     },
     "immediate": False,
@@ -139,6 +142,32 @@ HUEY = {
     'cache_mb': 64,  # 限制SQLite缓存大小
     'fsync': False,  # 提高性能，但降低持久性
 }
+# translation queue: building translated feeds, long and rate limited by the engines,
+# so a translation backlog never holds up feed polling. Started by run_huey_translate
+HUEY_TRANSLATE = {
+    **HUEY,
+    "name": "translate",
+    "filename": DATA_FOLDER / "tasks_translate.sqlite3",
+    "consumer": {
+        "workers": int(os.environ.get("HUEY_TRANSLATE_WORKERS", 3)),
+        "worker_type": "greenlet",
+    },
+}
+
+# Shared async feed fetcher, see utils/feed_fetcher.py
+FEED_FETCH_CONCURRENCY = int(os.environ.get("FEED_FETCH_CONCURRENCY", 20))
+FEED_FETCH_PER_HOST = int(os.environ.get("FEED_FETCH_PER_HOST", 4))
+FEED_FETCH_HTTP2 = os.environ.get("FEED_FETCH_HTTP2") == "1"  # requires the h2 package
+# feeds due for an update are enqueued by a periodic dispatcher, at most this many per minute
+FEED_DISPATCH_BATCH = int(os.environ.get("FEED_DISPATCH_BATCH", 200))
+# seconds a feed task lease lives without a heartbeat, see core/leases.py
+TASK_LEASE_TTL = int(os.environ.get("TASK_LEASE_TTL", 300))
+
+# In-process LRU in front of the translation cache table, see translator/cache.py
+TRANSLATION_CACHE_MB = int(os.environ.get("TRANSLATION_CACHE_MB", 32))
+
+# Minimum langdetect probability to pass an entry through untranslated (T_Feed.skip_same_language)
+SKIP_LANGUAGE_CONFIDENCE = float(os.environ.get("SKIP_LANGUAGE_CONFIDENCE", 0.9))
 # Password validation
 # https://docs.djangoproject.com/en/4.2/ref/settings/#auth-password-validators
 
@@ -9,12 +9,14 @@ from django.shortcuts import render, redirect
 from django.urls import reverse
 from django.http import HttpResponse
 from django.db import transaction
+from django.utils import timezone
 from django.utils.translation import gettext_lazy as _
 
 from utils.modelAdmin_utils import get_translator_and_summary_choices
 from .custom_admin_site import core_admin_site
-from .models import O_Feed
-from .tasks import update_original_feed, update_translated_feed
+from .models import O_Feed, T_Feed
+from .tasks import next_run_time, schedule_feed_batches, update_translated_feed
+from .task_index import task_index
 
 
 @admin.display(description=_("Export selected feeds as OPML"))
@@ -103,16 +105,20 @@ def t_feed_export_as_opml(modeladmin, request, queryset):
 @admin.display(description=_("Force update"))
 def o_feed_force_update(modeladmin, request, queryset):
     logging.info("Call o_feed_force_update: %s", queryset)
+    feeds = []
     with transaction.atomic():
         for instance in queryset:
             instance.etag = ""
+            instance.last_modified = ""
             instance.valid = None
+            # pulled by the batches below, not due for the dispatcher as well
+            instance.next_run_at = next_run_time(
+                instance.sid, instance.update_frequency, timezone.now()
+            )
             instance.save()
-            #logging.info("Call revoke_tasks_by_arg in o_feed_force_update")
-            #revoke_tasks_by_arg(instance.sid)
-            update_original_feed.schedule(
-                args=(instance.sid,True), delay=1,
-            )  # 会执行一次save()
+            feeds.append((instance.sid, instance.last_run_duration))
+    # fetch in batches on the shared fetcher, spread over the workers instead of all at once
+    schedule_feed_batches(feeds, force=True)  # 会执行一次save()
 
 
 @admin.display(description=_("Force update"))
@@ -123,10 +129,8 @@ def t_feed_force_update(modeladmin, request, queryset):
             instance.modified = None
             instance.status = None
             instance.save()
-            #logging.info("Call revoke_tasks_by_arg in o_feed_force_update")
-            #revoke_tasks_by_arg(instance.sid) #will check in update_translated_feed task
-            update_translated_feed.schedule(
-                args=(instance.sid,True), delay=1
+            task_index.schedule(
+                update_translated_feed, (instance.sid, True), delay=1
             )  # 会执行一次save()
 
 
@@ -142,6 +146,7 @@ def o_feed_batch_modify(modeladmin, request, queryset):
             "translation_display": "translation_display_value",
             "summary_engine": "summary_engine_value",
             "summary_detail": "summary_detail_value",
+            "summary_mode": "summary_mode_value",
             "additional_prompt": "additional_prompt_value",
             "fetch_article": "fetch_article",
             "quality": "quality",
@@ -152,6 +157,7 @@ def o_feed_batch_modify(modeladmin, request, queryset):
             "max_posts": int,
             "translation_display": int,
             "summary_detail": float,
+            "summary_mode": int,
             "additional_prompt": str,
             "fetch_article": literal_eval,
             "quality": literal_eval,
@@ -185,6 +191,7 @@ def o_feed_batch_modify(modeladmin, request, queryset):
 
         if update_fields:
             queryset.update(**update_fields)
+            T_Feed.objects.filter(o_feed__in=queryset).update(content_hash="")
         # for obj in queryset:
         #     obj.category.update_count()
 
@@ -223,6 +230,7 @@ def t_feed_batch_modify(modeladmin, request, queryset):
         translate_title = request.POST.get("translate_title", "Keep")
         translate_content = request.POST.get("translate_content", "Keep")
         summary = request.POST.get("summary", "Keep")
+        skip_same_language = request.POST.get("skip_same_language", "Keep")
         match translate_title:
             case "Keep":
                 pass
@@ -247,6 +255,18 @@ def t_feed_batch_modify(modeladmin, request, queryset):
             case "False":
                 queryset.update(summary=False)
 
+        match skip_same_language:
+            case "Keep":
+                pass
+            case "True":
+                queryset.update(skip_same_language=True)
+            case "False":
+                queryset.update(skip_same_language=False)
+
+        # rebuild the modified translated feeds on next poll
+        if {translate_title, translate_content, summary, skip_same_language} != {"Keep"}:
+            queryset.update(content_hash="")
+
         # self.message_user(request, f"Successfully modified {queryset.count()} items.")
         # return HttpResponseRedirect(request.get_full_path())
         return redirect(request.get_full_path())
@@ -5,6 +5,7 @@ from django.contrib.auth.models import User, Group
 from django.utils.html import format_html
 from django.utils.translation import gettext_lazy as _
 from django.urls import path, reverse
+from django.utils import timezone
 
 from .models import O_Feed, T_Feed
 from .custom_admin_site import core_admin_site
@@ -18,7 +19,8 @@ from .actions import (
     o_feed_batch_modify,
     t_feed_batch_modify,
 )
-from .tasks import update_original_feed, update_translated_feed
+from .tasks import next_run_time, update_original_feed, update_translated_feed
+from .task_index import task_index
 from utils.modelAdmin_utils import valid_icon
 from .views import import_opml
 
@@ -35,6 +37,8 @@ class O_FeedAdmin(admin.ModelAdmin):
         "size_in_kb",
         "update_frequency",
         "last_pull",
+        "next_run_at",
+        "not_modified_rate",
         "category",
     ]
     search_fields = ["name", "feed_url", "category__name"]
@@ -63,8 +67,7 @@ class O_FeedAdmin(admin.ModelAdmin):
             if instance.o_feed.pk:  # 不保存o_feed为空的T_Feed实例
                 instance.status = None
                 instance.save()
-                #revoke_tasks_by_arg(instance.sid)
-                update_translated_feed.schedule(args=(instance.sid,True), delay=1)
+                task_index.schedule(update_translated_feed, (instance.sid, True), delay=1)
 
         for instance in formset.deleted_objects:
             #revoke_tasks_by_arg(instance.sid)
@@ -82,18 +85,22 @@ class O_FeedAdmin(admin.ModelAdmin):
             obj.valid = None
             obj.name = obj.name or "Loading"
             obj.save()
-            update_original_feed.schedule(
-                args=(obj.sid,True), delay=1
+            # pulled right below, not due for the dispatcher as well (sid is set on the first save)
+            obj.next_run_at = next_run_time(obj.sid, obj.update_frequency, timezone.now())
+            obj.save(update_fields=["next_run_at"])
+            task_index.schedule(
+                update_original_feed, (obj.sid, True), delay=1
             )  # 会执行一次save() # 不放在model的save里是为了排除translator的更新，省流量
-        elif frequency_changed:
-            obj.save()
-            #revoke_tasks_by_arg(obj.sid)
-            update_original_feed.schedule(
-                args=(obj.sid,), delay=obj.update_frequency * 60
-            )
         else:
+            if frequency_changed:
+                obj.next_run_at = next_run_time(
+                    obj.sid, obj.update_frequency, obj.last_pull or timezone.now()
+                )
             obj.name = obj.name or "Empty"
             obj.save()
+            if set(form.changed_data) - {"update_frequency"}:
+                # translator/max_posts etc. changed, rebuild the translated feeds on next poll
+                obj.t_feed_set.update(content_hash="")
 
     @admin.display(description=_("Translator"))
     def translator(self, obj):
@@ -112,6 +119,11 @@ class O_FeedAdmin(admin.ModelAdmin):
     def size_in_kb(self, obj):
         return int(obj.size / 1024)
 
+    @admin.display(description=_("304 Rate"))
+    def not_modified_rate(self, obj):
+        # share of conditional GETs answered with 304 Not Modified
+        return f"{obj.not_modified_rate():.0%}" if obj.fetch_count else "-"
+
     @admin.display(description=_("Valid"), ordering="valid")
     def is_valid(self, obj):
         return valid_icon(obj.valid)
@@ -146,8 +158,10 @@ class T_FeedAdmin(admin.ModelAdmin):
         "translate_title",
         "translate_content",
         "summary",
+        "skip_same_language",
         "total_tokens",
         "total_characters",
+        "skipped_entries",
         "size_in_kb",
         "modified",
     ]
@@ -160,6 +174,7 @@ class T_FeedAdmin(admin.ModelAdmin):
         "o_feed",
         "total_tokens",
         "total_characters",
+        "skipped_entries",
         "size",
         "modified",
     ]
@@ -188,6 +203,12 @@ class T_FeedAdmin(admin.ModelAdmin):
     def has_add_permission(self, request):
         return False
 
+    def save_model(self, request, obj, form, change):
+        if form.changed_data:
+            # translate_title/summary etc. changed, rebuild the translated feed on next poll
+            obj.content_hash = ""
+        super().save_model(request, obj, form, change)
+
     def status_icon(self, obj):
         return valid_icon(obj.status)
 
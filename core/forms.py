@@ -45,6 +45,7 @@ class O_FeedForm(forms.ModelForm):
             "max_posts",
             "translation_display",
             "summary_detail",
+            "summary_mode",
             "additional_prompt",
             "fetch_article",
             "quality",
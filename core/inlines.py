@@ -19,6 +19,7 @@ class T_FeedInline(admin.TabularInline):
         "translate_title",
         "translate_content",
         "summary",
+        "skip_same_language",
         "total_tokens",
         "total_characters",
         "size_in_kb",
@@ -0,0 +1,88 @@
+import logging
+import os
+import socket
+import threading
+import uuid
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import IntegrityError, connections, transaction
+from django.utils import timezone
+
+from .models import Task_Lease
+
+
+class TaskLease:
+    """
+    Database leases on task keys, shared by every consumer and the web process.
+
+    acquire() takes the free or expired keys atomically, a heartbeat thread keeps
+    extending them while the task runs, release() drops them. A worker that dies
+    without releasing loses its leases once TASK_LEASE_TTL has passed.
+    """
+
+    def __init__(self, *keys: str, ttl: int = None):
+        self.keys = keys
+        self.ttl = timedelta(seconds=ttl or settings.TASK_LEASE_TTL)
+        self.owner = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+        self.acquired = []
+        self._stop = threading.Event()
+        self._heartbeat = None
+
+    def _try_acquire(self, key: str) -> bool:
+        now = timezone.now()
+        values = {"owner": self.owner, "expires_at": now + self.ttl, "heartbeat_at": now}
+        # take over an expired lease, or create a new one
+        if Task_Lease.objects.filter(key=key, expires_at__lt=now).update(**values):
+            return True
+        try:
+            with transaction.atomic():
+                Task_Lease.objects.create(key=key, **values)
+            return True
+        except IntegrityError:
+            return False
+
+    def acquire(self) -> list:
+        """Return the keys this lease now holds"""
+        self.acquired = [key for key in self.keys if self._try_acquire(key)]
+        if self.acquired:
+            self._heartbeat = threading.Thread(target=self._beat, daemon=True)
+            self._heartbeat.start()
+        return self.acquired
+
+    def renew(self):
+        now = timezone.now()
+        renewed = Task_Lease.objects.filter(
+            key__in=self.acquired, owner=self.owner
+        ).update(expires_at=now + self.ttl, heartbeat_at=now)
+        if renewed < len(self.acquired):
+            logging.warning("TaskLease %s lost %d leases", self.owner, len(self.acquired) - renewed)
+
+    def _beat(self):
+        try:
+            while not self._stop.wait(self.ttl.total_seconds() / 3):
+                try:
+                    self.renew()
+                except Exception as e:
+                    logging.warning("TaskLease heartbeat: %s", str(e))
+        finally:
+            connections.close_all()  # only the connections of this thread
+
+    def release(self):
+        self._stop.set()
+        if self._heartbeat:
+            self._heartbeat.join()
+            self._heartbeat = None
+        if self.acquired:
+            Task_Lease.objects.filter(key__in=self.acquired, owner=self.owner).delete()
+            self.acquired = []
+
+    def __enter__(self) -> list:
+        return self.acquire()
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.release()
+
+
+def lease_key(task_name: str, sid: str) -> str:
+    return f"{task_name}:{sid}"
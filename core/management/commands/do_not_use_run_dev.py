@@ -18,6 +18,7 @@ class Command(BaseCommand):
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
         self.process = None
+        self.translate_process = None
 
     def handle(self, *args, **options):
         # Set DEBUG environment variable to '1'
@@ -34,6 +35,7 @@ class Command(BaseCommand):
 
         # Start run_huey in a separate process using the same Python interpreter
         self.process = subprocess.Popen([sys.executable, "manage.py", "run_huey", "-f"])
+        self.translate_process = subprocess.Popen([sys.executable, "manage.py", "run_huey_translate", "-f"])
 
         # Create default superuser
         call_command("create_default_superuser")
@@ -45,6 +47,7 @@ class Command(BaseCommand):
             call_command("runserver")
         finally:
             # Attempt to terminate the subprocess when the server is stopped
-            if self.process:
-                self.process.terminate()
-                self.process.wait()
+            for process in (self.process, self.translate_process):
+                if process:
+                    process.terminate()
+                    process.wait()
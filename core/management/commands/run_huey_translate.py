@@ -0,0 +1,34 @@
+import logging
+
+from django.conf import settings
+from django.utils.module_loading import autodiscover_modules
+from huey.consumer_options import ConsumerConfig
+from huey.contrib.djhuey.management.commands.run_huey import Command as RunHueyCommand
+
+
+class Command(RunHueyCommand):
+    """
+    Consumer of the translation queue, takes the same options as run_huey.
+    Worker defaults come from settings.HUEY_TRANSLATE["consumer"].
+    """
+
+    help = "Run the translation queue consumer"
+
+    def handle(self, *args, **options):
+        consumer_options = dict(settings.HUEY_TRANSLATE.get("consumer", {}))
+        for key, value in options.items():
+            if value is not None:
+                consumer_options[key] = value
+
+        if not options.get("disable_autoload"):
+            autodiscover_modules("tasks")
+
+        from core.queues import translate_huey
+
+        config = ConsumerConfig(**consumer_options)
+        config.validate()
+        logger = logging.getLogger("huey")
+        if not logger.handlers:
+            config.setup_logger(logger)
+
+        translate_huey.create_consumer(**config.values).run()
@@ -0,0 +1,28 @@
+# Generated by Django 5.2.18 on 2026-10-18 16:49
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0016_alter_t_feed_translate_title'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='o_feed',
+            name='fetch_count',
+            field=models.IntegerField(default=0, editable=False, verbose_name='Fetch Count'),
+        ),
+        migrations.AddField(
+            model_name='o_feed',
+            name='last_modified',
+            field=models.CharField(default='', editable=False, max_length=255),
+        ),
+        migrations.AddField(
+            model_name='o_feed',
+            name='not_modified_count',
+            field=models.IntegerField(default=0, editable=False, help_text='Number of fetches answered with 304 Not Modified', verbose_name='Not Modified Count'),
+        ),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 5.2.18 on 2026-10-18 16:50
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0017_o_feed_last_modified_fetch_count'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='o_feed',
+            name='content_hash',
+            field=models.CharField(default='', editable=False, help_text='Fingerprint of the feed entries, translated feeds are rebuilt only when it changes', max_length=39),
+        ),
+        migrations.AddField(
+            model_name='t_feed',
+            name='content_hash',
+            field=models.CharField(default='', editable=False, help_text='Fingerprint of the original feed this translation was built from', max_length=39),
+        ),
+    ]
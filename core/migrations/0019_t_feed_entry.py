@@ -0,0 +1,28 @@
+# Generated by Django 5.2.18 on 2026-10-18 16:50
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0018_o_feed_content_hash_t_feed_content_hash'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='T_Feed_Entry',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('key', models.CharField(editable=False, help_text='Hash of entry id, updated time and translation options', max_length=39)),
+                ('title', models.TextField(blank=True, null=True)),
+                ('summary', models.TextField(blank=True, null=True)),
+                ('content', models.TextField(blank=True, null=True)),
+                ('t_feed', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='core.t_feed')),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('t_feed', 'key'), name='unique_t_feed_entry_key')],
+            },
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.18 on 2026-10-18 17:00
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0019_t_feed_entry'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='o_feed',
+            name='summary_mode',
+            field=models.IntegerField(choices=[(0, 'Sequential'), (1, 'Map-Reduce')], default=0, help_text='Sequential: each chunk is summarized with the previous summaries. Map-Reduce: chunks are summarized in parallel, then combined (faster for long articles)', verbose_name='Summary Mode'),
+        ),
+    ]
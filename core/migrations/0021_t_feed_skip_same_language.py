@@ -0,0 +1,23 @@
+# Generated by Django 5.2.18 on 2026-10-18 17:10
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0020_o_feed_summary_mode'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='t_feed',
+            name='skip_same_language',
+            field=models.BooleanField(default=False, help_text='Do not translate entries already written in the target language', verbose_name='Skip Same Language'),
+        ),
+        migrations.AddField(
+            model_name='t_feed',
+            name='skipped_entries',
+            field=models.IntegerField(default=0, editable=False, help_text='Entries passed through untranslated because they are already in the target language', verbose_name='Skipped Entries'),
+        ),
+    ]
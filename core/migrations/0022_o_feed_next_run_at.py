@@ -0,0 +1,23 @@
+# Generated by Django 5.2.18 on 2026-10-18 17:16
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0021_t_feed_skip_same_language'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='o_feed',
+            name='last_run_duration',
+            field=models.FloatField(default=0, editable=False, help_text='Seconds', verbose_name='Last Run Duration'),
+        ),
+        migrations.AddField(
+            model_name='o_feed',
+            name='next_run_at',
+            field=models.DateTimeField(blank=True, default=None, editable=False, help_text='The feed is pulled by the dispatcher once this time has passed', null=True, verbose_name='Next Run(UTC)'),
+        ),
+    ]
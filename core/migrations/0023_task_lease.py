@@ -0,0 +1,23 @@
+# Generated by Django 5.2.18 on 2026-10-18 17:19
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0022_o_feed_next_run_at'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Task_Lease',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('key', models.CharField(max_length=255, unique=True)),
+                ('owner', models.CharField(max_length=255)),
+                ('expires_at', models.DateTimeField()),
+                ('heartbeat_at', models.DateTimeField()),
+            ],
+        ),
+    ]
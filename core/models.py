@@ -52,6 +52,42 @@ class O_Feed(models.Model):
         default="",
         editable=False,
     )
+    last_modified = models.CharField(
+        max_length=255,
+        default="",
+        editable=False,
+    )
+    content_hash = models.CharField(
+        max_length=39,
+        default="",
+        editable=False,
+        help_text=_("Fingerprint of the feed entries, translated feeds are rebuilt only when it changes"),
+    )
+    next_run_at = models.DateTimeField(
+        _("Next Run(UTC)"),
+        default=None,
+        blank=True,
+        null=True,
+        editable=False,
+        help_text=_("The feed is pulled by the dispatcher once this time has passed"),
+    )
+    last_run_duration = models.FloatField(
+        _("Last Run Duration"),
+        default=0,
+        editable=False,
+        help_text=_("Seconds"),
+    )
+    fetch_count = models.IntegerField(
+        _("Fetch Count"),
+        default=0,
+        editable=False,
+    )
+    not_modified_count = models.IntegerField(
+        _("Not Modified Count"),
+        default=0,
+        editable=False,
+        help_text=_("Number of fetches answered with 304 Not Modified"),
+    )
     size = models.IntegerField(
         _("Size"),
         default=0,
@@ -108,6 +144,19 @@ class O_Feed(models.Model):
         ),
     )
 
+    SUMMARY_MODE_CHOICES = [
+        (0, _("Sequential")),
+        (1, _("Map-Reduce")),
+    ]
+    summary_mode = models.IntegerField(
+        _("Summary Mode"),
+        default=0,
+        choices=SUMMARY_MODE_CHOICES,
+        help_text=_(
+            "Sequential: each chunk is summarized with the previous summaries. Map-Reduce: chunks are summarized in parallel, then combined (faster for long articles)"
+        ),
+    )
+
     additional_prompt = models.TextField(
         _("Addtional Prompt"),
         default=None,
@@ -136,6 +185,9 @@ class O_Feed(models.Model):
     def get_translation_display(self):
         return dict(self.TRANSLATION_DISPLAY_CHOICES)[self.translation_display]
 
+    def not_modified_rate(self) -> float:
+        return self.not_modified_count / self.fetch_count if self.fetch_count else 0.0
+
 
 class T_Feed(models.Model):
     sid = models.SlugField(
@@ -161,9 +213,20 @@ class T_Feed(models.Model):
     translate_title = models.BooleanField(_("Translate Title"), default=False)
     translate_content = models.BooleanField(_("Translate Content"), default=False)
     summary = models.BooleanField(_("Summary"), default=False)
+    skip_same_language = models.BooleanField(
+        _("Skip Same Language"),
+        default=False,
+        help_text=_("Do not translate entries already written in the target language"),
+    )
 
     total_tokens = models.IntegerField(_("Tokens Cost"), default=0)
     total_characters = models.IntegerField(_("Characters Cost"), default=0)
+    skipped_entries = models.IntegerField(
+        _("Skipped Entries"),
+        default=0,
+        editable=False,
+        help_text=_("Entries passed through untranslated because they are already in the target language"),
+    )
 
     modified = models.DateTimeField(
         _("Last Modified"),
@@ -177,6 +240,12 @@ class T_Feed(models.Model):
         default=0,
         editable=False,
     )
+    content_hash = models.CharField(
+        max_length=39,
+        default="",
+        editable=False,
+        help_text=_("Fingerprint of the original feed this translation was built from"),
+    )
 
     # translate_paragraphs = models.IntegerField(_("Translate Paragraphs"), default=0)
 
@@ -200,3 +269,39 @@ class T_Feed(models.Model):
         # else:
         #     self.sid = self.sid
         super(T_Feed, self).save(*args, **kwargs)
+
+
+class T_Feed_Entry(models.Model):
+    """Rendered output of one translated entry, reused while the entry is unchanged"""
+
+    t_feed = models.ForeignKey(T_Feed, on_delete=models.CASCADE)
+    key = models.CharField(
+        max_length=39,
+        editable=False,
+        help_text=_("Hash of entry id, updated time and translation options"),
+    )
+    title = models.TextField(blank=True, null=True)
+    summary = models.TextField(blank=True, null=True)
+    content = models.TextField(blank=True, null=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["t_feed", "key"], name="unique_t_feed_entry_key"
+            )
+        ]
+
+    def __str__(self):
+        return self.key
+
+
+class Task_Lease(models.Model):
+    """Exclusive right of one worker to run the task of a feed, see core/leases.py"""
+
+    key = models.CharField(max_length=255, unique=True)
+    owner = models.CharField(max_length=255)
+    expires_at = models.DateTimeField()
+    heartbeat_at = models.DateTimeField()
+
+    def __str__(self):
+        return self.key
@@ -0,0 +1,27 @@
+from django.conf import settings
+from django.utils.module_loading import import_string
+from huey.contrib.djhuey import close_db
+
+
+def create_huey(config: dict):
+    """Build a huey instance from a settings dict shaped like settings.HUEY"""
+    config = config.copy()
+    name = config.pop("name")
+    huey_class = import_string(config.pop("huey_class"))
+    config.pop("consumer", None)
+    return huey_class(name, **config)
+
+
+# second queue next to the djhuey one, see settings.HUEY_TRANSLATE
+translate_huey = create_huey(settings.HUEY_TRANSLATE)
+
+
+def translate_task(*args, **kwargs):
+    """Same as djhuey's db_task, on the translation queue"""
+
+    def decorator(fn):
+        ret = translate_huey.task(*args, **kwargs)(close_db(fn))
+        ret.call_local = fn
+        return ret
+
+    return decorator
@@ -6,20 +6,24 @@ from django.db.models.signals import post_delete
 from django.dispatch import receiver
 
 from .models import O_Feed, T_Feed
+from .task_index import task_index
 # from taggit.models import TaggedItem
 
 
 @receiver(post_delete, sender=O_Feed)
 def delete_o_feed_xml(sender, instance, **kwargs):
     logging.info("Call delete_xml: %s", instance.sid)
-    feed_file_path = f"{settings.DATA_FOLDER}/feeds/{instance.sid}.xml"
-    if os.path.exists(feed_file_path):
-        os.remove(feed_file_path)
+    task_index.revoke(instance.sid)
+    for suffix in ("xml", "pickle"):
+        feed_file_path = f"{settings.DATA_FOLDER}/feeds/{instance.sid}.{suffix}"
+        if os.path.exists(feed_file_path):
+            os.remove(feed_file_path)
 
 
 @receiver(post_delete, sender=T_Feed)
 def delete_t_feed_xml(sender, instance, **kwargs):
     logging.info("Call delete_xml: %s", instance.sid)
+    task_index.revoke(instance.sid)
     feed_file_path = f"{settings.DATA_FOLDER}/feeds/{instance.sid}.xml"
     if os.path.exists(feed_file_path):
         os.remove(feed_file_path)
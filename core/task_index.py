@@ -0,0 +1,92 @@
+import json
+import logging
+import time
+import uuid
+from typing import Optional
+
+from huey.constants import EmptyData
+
+
+class TaskIndex:
+    """
+    Side index of the queued feed tasks: sid -> task id, eta and arguments.
+
+    It lives in the huey kv store, so deduplication and revocation are a single key
+    lookup instead of deserializing huey.scheduled() + huey.pending().
+    Tasks are keyed by their first argument (the sid), the optional second argument
+    is the force flag. The index is kept by the first huey, records remember the
+    queue of their task so it is revoked on the right one.
+    """
+
+    prefix = "task-index:"
+    stale_after = 3600  # 超过eta一小时仍未执行的记录视为失效
+
+    def __init__(self, huey, *other_hueys):
+        self.huey = huey
+        self.queues = {h.name: h for h in (huey, *other_hueys)}
+
+    def _queue(self, entry: dict):
+        return self.queues.get(entry.get("queue"), self.huey)
+
+    def _key(self, sid: str) -> str:
+        return f"{self.prefix}{sid}"
+
+    def get(self, sid: str) -> Optional[dict]:
+        data = self.huey.storage.peek_data(self._key(sid))
+        if data is EmptyData:
+            return None
+        try:
+            entry = json.loads(data)
+        except (TypeError, ValueError):
+            return None
+        if entry["eta"] + self.stale_after < time.time():
+            return None
+        return entry
+
+    def put(self, sid: str, task_id: str, eta: float, args: tuple, queue: str = None):
+        entry = {"id": task_id, "eta": eta, "args": list(args), "queue": queue or self.huey.name}
+        self.huey.storage.put_data(self._key(sid), json.dumps(entry).encode())
+
+    def discard(self, sid: str, task_id: Optional[str] = None):
+        """Forget the queued task of sid, only if it is still task_id when given"""
+        if task_id is not None:
+            entry = self.get(sid)
+            if entry and entry["id"] != task_id:
+                return
+        self.huey.storage.delete_data(self._key(sid))
+
+    def revoke(self, sid: str):
+        """Revoke the queued task of sid, if any"""
+        entry = self.get(sid)
+        if entry:
+            logging.info("Revoke task: %s %s", sid, entry["id"])
+            self._queue(entry).revoke_by_id(entry["id"])
+        self.huey.storage.delete_data(self._key(sid))
+
+    def schedule(self, task, args: tuple, delay: int = 0):
+        """
+        Schedule task(*args) unless the same sid is already queued to run no later,
+        with at least the same force flag. A queued task that does not cover the new
+        one is revoked and replaced, so each sid has at most one queued task.
+        """
+        sid = args[0]
+        eta = time.time() + delay
+        entry = self.get(sid)
+        if entry:
+            if entry["eta"] <= eta and self._force(entry["args"]) >= self._force(args):
+                return None
+            self._queue(entry).revoke_by_id(entry["id"])
+        task_id = uuid.uuid4().hex  # results are disabled, so schedule() returns no id
+        task.schedule(args=args, delay=delay, id=task_id)
+        self.put(sid, task_id, eta, args, task.huey.name)
+        return task_id
+
+    @staticmethod
+    def _force(args) -> bool:
+        return bool(args[1]) if len(args) > 1 else False
+
+
+from huey.contrib.djhuey import HUEY as huey  # noqa: E402
+from .queues import translate_huey  # noqa: E402
+
+task_index = TaskIndex(huey, translate_huey)
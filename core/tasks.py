@@ -1,84 +1,217 @@
+import copy
+import heapq
 import json
+import pickle
+import threading
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
 from datetime import datetime, timezone
 import logging
 import os
 from pathlib import Path
+import time
 from time import mktime
 
 import feedparser
 import cityhash
 from django.conf import settings
-from django.db import IntegrityError
+from django.db import IntegrityError, connections, transaction
+from django.db.models import Q
 
 from huey.contrib.djhuey import HUEY as huey
-from huey.contrib.djhuey import on_startup, db_task, on_shutdown
-
-from .models import O_Feed, T_Feed
+from huey import crontab
+from huey.contrib.djhuey import on_startup, db_task, db_periodic_task, on_shutdown
+from huey.signals import SIGNAL_EXECUTING, SIGNAL_RETRYING
+
+from .models import O_Feed, T_Feed, T_Feed_Entry
+from .leases import TaskLease, lease_key
+from .queues import translate_task, translate_huey
+from .task_index import task_index
 from translator.models import TranslatorEngine, Translated_Content
+from translator.cache import translation_cache
+from translator.singleflight import translation_flight
+from translator.throttle import engine_call
 
-from utils.feed_action import fetch_feed, generate_atom_feed
+from utils.feed_action import fetch_feed, fetch_feeds, feed_fingerprint, generate_atom_feed
+from utils.feed_fetcher import fetcher
 from utils import text_handler
 from feed2json import feed2json
-from bs4 import BeautifulSoup
 import mistune
 import newspaper
 from typing import Optional
 
 
 # from huey_monitor.models import TaskModel
-unique_tasks = set()
+DEFAULT_RUN_DURATION = 5  # seconds, for feeds that were never pulled
 
 def revoke_tasks_by_arg(arg_to_match):
-    for task in huey.scheduled() + huey.pending():
-        # Assuming the first argument is the one we're interested in (e.g., obj.pk)
-        if task.args and task.args[0] == arg_to_match:
-            logging.info("Revoke task: %s", task)
-            huey.revoke_by_id(task)
+    task_index.revoke(arg_to_match)
+
+
+def forget_executing_task(signal_name, task, *args, **kwargs):
+    # the task left the queue, only a newer task of the same sid may stay indexed
+    if task.args and isinstance(task.args[0], str):
+        task_index.discard(task.args[0], task.id)
+
+
+def index_retrying_task(queue, signal_name, task, *args, **kwargs):
+    if task.args and isinstance(task.args[0], str):
+        eta = task.eta.replace(tzinfo=timezone.utc).timestamp() if task.eta else time.time()
+        task_index.put(task.args[0], task.id, eta, task.args, queue)
+
+
+def connect_task_index(*hueys):
+    """Keep task_index in step with the tasks the queues start or retry"""
+    for task_queue in hueys:
+        task_queue.signal(SIGNAL_EXECUTING)(forget_executing_task)
+        task_queue.signal(SIGNAL_RETRYING)(partial(index_retrying_task, task_queue.name))
+
+
+connect_task_index(huey, translate_huey)
+
 
-# @periodic_task(crontab( minute='*/1'))
 @on_startup()
 def schedule_update():
-    feeds = O_Feed.objects.all()
-    tasks = huey.scheduled() + huey.pending()
-    task_feeds = {task.args[0] for task in tasks if task.args}
-
-    for feed in feeds:
-        if feed.sid not in task_feeds:
-            update_original_feed.schedule(
-                args=(feed.sid,), delay=feed.update_frequency * 60
+    # schedules live in the database and survive restarts, only pulled feeds without one
+    # (created before next_run_at existed) get it here, never pulled feeds are due at once
+    for feed in O_Feed.objects.filter(next_run_at__isnull=True, last_pull__isnull=False):
+        feed.next_run_at = next_run_time(feed.sid, feed.update_frequency, feed.last_pull)
+        feed.save(update_fields=["next_run_at"])
+
+
+@db_periodic_task(crontab(minute="*"))
+def dispatch_due_feeds():
+    """Enqueue the feeds whose next_run_at has passed, in bounded batches"""
+    now = datetime.now(timezone.utc)
+    due = list(
+        O_Feed.objects.filter(Q(next_run_at__lte=now) | Q(next_run_at__isnull=True))
+        .order_by("next_run_at")
+        .values_list("pk", "sid", "update_frequency", "last_run_duration")[
+            : settings.FEED_DISPATCH_BATCH
+        ]
+    )
+    if not due:
+        return
+    logging.info("Dispatch %d due feeds", len(due))
+    # claim them first, a slow batch is not dispatched again on the next tick
+    with transaction.atomic():
+        for pk, sid, update_frequency, _ in due:
+            O_Feed.objects.filter(pk=pk).update(
+                next_run_at=next_run_time(sid, update_frequency, now)
             )
+    schedule_feed_batches([(sid, duration) for _, sid, _, duration in due])
+
+
+def next_run_time(sid: str, update_frequency: int, after: datetime) -> datetime:
+    """
+    Next pull time of a feed, about one update interval after `after`.
+    Every sid has a fixed phase within its interval, so feeds sharing an
+    update_frequency are spread over the interval instead of firing together.
+    """
+    period = max(update_frequency, 1) * 60
+    phase = cityhash.CityHash64(sid) % period
+    timestamp = after.timestamp() + period / 2
+    slot = timestamp - timestamp % period + phase
+    if slot <= timestamp:
+        slot += period
+    return datetime.fromtimestamp(slot, tz=timezone.utc)
+
+
+def spread_delays(costs: list, workers: int, start: float = 1) -> list:
+    """Start delays for tasks of the estimated costs(seconds), so at most `workers` run at once"""
+    free_at = [start] * max(workers, 1)
+    delays = []
+    for cost in costs:
+        delay = heapq.heappop(free_at)
+        delays.append(delay)
+        heapq.heappush(free_at, delay + cost)
+    return delays
+
+
+def schedule_feed_batches(feeds: list, force: bool = False):
+    """
+    Enqueue update_original_feeds for (sid, last_run_duration) pairs, in batches of
+    FEED_FETCH_CONCURRENCY spread over the worker capacity instead of all at once.
+    """
+    size = settings.FEED_FETCH_CONCURRENCY
+    batches = [feeds[i : i + size] for i in range(0, len(feeds), size)]
+    # a batch is fetched concurrently, it lasts about as long as its slowest feed
+    costs = [
+        max(duration for _, duration in batch) or DEFAULT_RUN_DURATION
+        for batch in batches
+    ]
+    delays = spread_delays(costs, settings.HUEY["consumer"]["workers"])
+    for batch, delay in zip(batches, delays):
+        update_original_feeds.schedule(
+            args=([sid for sid, _ in batch], force), delay=delay
+        )
+
 
 @on_shutdown()
 def cleanup_tasks():
-    huey.storage.flush_all()
+    fetcher.close()
 
 
 @db_task(retries=3)
 def update_original_feed(sid: str, force:bool = False):
-    if sid in unique_tasks: # 如果判断force的话，是没法停止正在执行的task
-        logging.warning("(skip)This task update_original_feed is executing: %s",sid)
-        return
-    else:
-        unique_tasks.add(sid)
+    with TaskLease(lease_key("update_original_feed", sid)) as acquired:
+        if not acquired: # 如果判断force的话，是没法停止正在执行的task
+            logging.warning("(skip)This task update_original_feed is executing: %s",sid)
+            return
+
+        try:
+            # obj = O_Feed.objects.get(sid=sid)
+            obj = O_Feed.objects.prefetch_related("t_feed_set").get(sid=sid)
+        except O_Feed.DoesNotExist:
+            return False
 
+        revoke_tasks_by_arg(sid)
+        logging.info("Call task update_original_feed: %s", obj.feed_url)
+        fetch_feed_results = fetch_feed(
+            url=obj.feed_url, etag=obj.etag, last_modified=obj.last_modified
+        )
+        save_original_feed(obj, fetch_feed_results)
+
+    update_t_feeds(obj, force=force)
+
+
+@db_task()
+def update_original_feeds(sids: list, force:bool = False):
+    """Fetch a batch of original feeds concurrently on the shared fetcher"""
+    keys = {lease_key("update_original_feed", sid): sid for sid in sids}
+    lease = TaskLease(*keys)
+    # feeds leased by another task are skipped
+    sids = [keys[key] for key in lease.acquire()]
+    if not sids:
+        return
     try:
-        # obj = O_Feed.objects.get(sid=sid)
-        obj = O_Feed.objects.prefetch_related("t_feed_set").get(sid=sid)
-    except O_Feed.DoesNotExist:
-        return False
+        objs = list(O_Feed.objects.prefetch_related("t_feed_set").filter(sid__in=sids))
+        logging.info("Call task update_original_feeds: %d feeds", len(objs))
+        for obj in objs:
+            revoke_tasks_by_arg(obj.sid)
+        results = fetch_feeds(
+            [(obj.feed_url, obj.etag, obj.last_modified) for obj in objs]
+        )
+        for obj, fetch_feed_results in zip(objs, results):
+            save_original_feed(obj, fetch_feed_results)
+    finally:
+        lease.release()
+
+    for obj in objs:
+        update_t_feeds(obj, force=force)
 
-    revoke_tasks_by_arg(sid)
-    logging.info("Call task update_original_feed: %s", obj.feed_url)
-    
+
+def save_original_feed(obj: O_Feed, fetch_feed_results: dict):
     feed_dir_path = Path(settings.DATA_FOLDER) / "feeds"
 
     if not os.path.exists(feed_dir_path):
         os.makedirs(feed_dir_path)
 
     original_feed_file_path = feed_dir_path / f"{obj.sid}.xml"
+    started = time.monotonic()
     try:
         obj.valid = False
-        fetch_feed_results = fetch_feed(url=obj.feed_url, etag=obj.etag)
         error = fetch_feed_results["error"]
         update = fetch_feed_results.get("update")
         xml = fetch_feed_results.get("xml")
@@ -86,9 +219,21 @@ def update_original_feed(sid: str, force:bool = False):
 
         if error:
             raise Exception(f"Fetch Original Feed Failed: {error}")
-        elif not update:
+
+        obj.fetch_count += 1
+        if fetch_feed_results.get("not_modified"):
+            obj.not_modified_count += 1
+
+        content_hash = feed_fingerprint(feed) if update else obj.content_hash
+        if not update:
             logging.info("Original Feed is up to date, Skip:%s", obj.feed_url)
+        elif (
+            content_hash == obj.content_hash
+            and os.path.exists(original_feed_file_path)
+        ):
+            logging.info("Original Feed content unchanged, Skip:%s", obj.feed_url)
         else:
+            obj.content_hash = content_hash
             with open(original_feed_file_path, "w", encoding="utf-8") as f:
                 f.write(xml)
             if obj.name in ["Loading", "Empty", None]:
@@ -101,40 +246,48 @@ def update_original_feed(sid: str, force:bool = False):
                 else None
             )
             # obj.last_pull = datetime.now(timezone.utc)
-            obj.etag = feed.get("etag", "")
 
+        if update:
+            # feedparser.parse(text) never sees the response headers, keep the validators of
+            # every 200 ourselves, also when the entries did not change
+            obj.etag = fetch_feed_results.get("etag", "")
+            obj.last_modified = fetch_feed_results.get("last_modified", "")
         obj.valid = True
         # update_original_feed.schedule(args=(obj.sid,), delay=obj.update_frequency * 60)
     except Exception as e:
         logging.exception("task update_original_feed %s: %s", obj.feed_url, str(e))
     finally:
         obj.last_pull = datetime.now(timezone.utc)
-        update_original_feed.schedule(args=(obj.sid,), delay=obj.update_frequency * 60)
+        obj.next_run_at = next_run_time(obj.sid, obj.update_frequency, obj.last_pull)
+        obj.last_run_duration = fetch_feed_results.get("elapsed", 0) + time.monotonic() - started
         obj.save()
-        unique_tasks.remove(sid)
 
-    # Update T_Feeds
-    t_feeds = obj.t_feed_set.all()
-    if obj.valid and t_feeds.exists():
-        for t_feed in t_feeds:
-            t_feed.status = None
-            t_feed.save()
-            update_translated_feed.schedule(args=(t_feed.sid,), delay=1)
 
+def update_t_feeds(obj: O_Feed, force: bool = False):
+    # only fan out to the translated feeds that were built from an older content fingerprint
+    if not obj.valid:
+        return
+    for t_feed in obj.t_feed_set.all():
+        if not force and t_feed.content_hash == obj.content_hash:
+            continue
+        t_feed.status = None
+        t_feed.save()
+        task_index.schedule(update_translated_feed, (t_feed.sid, force), delay=1)
 
-@db_task(retries=3)
+
+@translate_task(retries=3)
 def update_translated_feed(sid: str, force:bool = False):
-    if sid in unique_tasks: # 如果判断force的话，是没法停止正在执行的task
+    lease = TaskLease(lease_key("update_translated_feed", sid))
+    if not lease.acquire(): # 如果判断force的话，是没法停止正在执行的task
         logging.warning("(skip)The task update_translated_feed is executing: %s",sid)
         return
-    else:
-        unique_tasks.add(sid)
 
     try:
         # obj = T_Feed.objects.get(sid=sid)
         obj = T_Feed.objects.select_related("o_feed").get(sid=sid)
     except T_Feed.DoesNotExist:
         logging.error(f"T_Feed Not Found: {sid}")
+        lease.release()
         return False
 
     try:
@@ -144,7 +297,11 @@ def update_translated_feed(sid: str, force:bool = False):
         if obj.o_feed.pk is None:
             raise Exception("Unable translate feed, because Original Feed is None")
 
-        if not force and obj.modified == obj.o_feed.last_pull:
+        if (
+            not force
+            and obj.content_hash
+            and obj.content_hash == obj.o_feed.content_hash
+        ):
             logging.info(
                 "Translated Feed is up to date, Skip translation: %s",
                 obj.o_feed.feed_url,
@@ -164,11 +321,22 @@ def update_translated_feed(sid: str, force:bool = False):
 
         translated_feed_file_path = f"{feed_dir_path}/{obj.sid}"
 
-        original_feed = feedparser.parse(original_feed_file_path)
+        # parsed entries, languages and articles are shared by the T_Feeds of all languages
+        artifact = load_feed_artifact(obj.o_feed)
+        original_feed = artifact["feed"]
 
         if original_feed.entries:
             o_feed = obj.o_feed
             logging.info("Start translate feed: [%s]%s", obj.language, o_feed.feed_url)
+            # a forced update re-renders every entry
+            entry_index = (
+                {}
+                if force
+                else {
+                    e.key: {"title": e.title, "summary": e.summary, "content": e.content}
+                    for e in obj.t_feed_entry_set.all()
+                }
+            )
             results = translate_feed(
                 feed=original_feed,
                 target_language=obj.language,
@@ -178,10 +346,17 @@ def update_translated_feed(sid: str, force:bool = False):
                 summary=obj.summary,
                 summary_engine=o_feed.summary_engine,
                 summary_detail=o_feed.summary_detail,
+                summary_mode=o_feed.summary_mode,
                 max_posts=o_feed.max_posts,
                 translation_display=o_feed.translation_display,
                 quality=o_feed.quality,
                 fetch_article=o_feed.fetch_article,
+                entry_index=entry_index,
+                index_salt=entry_index_salt(obj),
+                skip_same_language=obj.skip_same_language,
+                feed_key=o_feed.sid,
+                languages=artifact["languages"],
+                articles=artifact["articles"],
             )
 
             if not results:
@@ -214,8 +389,12 @@ def update_translated_feed(sid: str, force:bool = False):
                 obj.total_tokens += total_tokens
             else:
                 obj.total_characters += translated_characters
+            obj.skipped_entries += results.get("skipped", 0)
 
+            save_entry_index(obj, results.get("index", {}))
             obj.modified = obj.o_feed.last_pull
+            # failed entries (rate limit, timeout...) are retried on the next poll
+            obj.content_hash = "" if results.get("failed") else obj.o_feed.content_hash
             obj.size = os.path.getsize(f"{translated_feed_file_path}.xml")
             obj.status = True
     except Exception as e:
@@ -228,7 +407,140 @@ def update_translated_feed(sid: str, force:bool = False):
         obj.status = False
     finally:
         obj.save()
-        unique_tasks.remove(sid)
+        lease.release()
+
+
+def entry_id(entry) -> str:
+    return entry.get("id") or entry.get("link") or ""
+
+
+def fetch_article_html(link: str) -> Optional[str]:
+    """Fetch the full article of an entry, as html"""
+    try:
+        article = newspaper.article(link)  # 勿使用build，因为不支持跳转
+        return mistune.html(article.text)
+    except Exception as e:
+        logging.warning("Fetch original article error:%s", e)
+        return None
+
+
+_artifact_locks = defaultdict(threading.Lock)
+
+
+def load_feed_artifact(o_feed: O_Feed) -> dict:
+    """
+    Return the preprocessing artifact of an original feed: the parsed feed, the
+    detected language of each entry and the fetched articles (when fetch_article is set).
+    It is built once per content fingerprint by the first T_Feed task and pickled next to
+    the xml, so the T_Feeds of the other languages only unpickle their own copy of it.
+    """
+    feed_dir_path = Path(settings.DATA_FOLDER) / "feeds"
+    artifact_path = feed_dir_path / f"{o_feed.sid}.pickle"
+    options = (o_feed.content_hash, o_feed.max_posts, o_feed.fetch_article)
+
+    with _artifact_locks[o_feed.sid]:
+        try:
+            with open(artifact_path, "rb") as f:
+                artifact = pickle.load(f)
+            if artifact.get("options") == options:
+                return artifact
+        except FileNotFoundError:
+            pass
+        except Exception as e:
+            logging.warning("load_feed_artifact %s: %s", o_feed.sid, str(e))
+
+        logging.info("Build feed artifact: %s", o_feed.feed_url)
+        feed = feedparser.parse(feed_dir_path / f"{o_feed.sid}.xml")
+        entries = feed.entries[: o_feed.max_posts]
+        languages = {
+            entry_id(entry): text_handler.detect_language_confidence(entry, o_feed.sid)
+            for entry in entries
+        }
+        articles = {}
+        if o_feed.fetch_article:
+            links = [entry.get("link") for entry in entries]
+            bodies = ordered_map(fetch_article_html, links, settings.FEED_FETCH_PER_HOST)
+            articles = {
+                entry_id(entry): body
+                for entry, body in zip(entries, bodies)
+                if body
+            }
+        if feed.get("bozo_exception") is not None:
+            # parser exceptions of bozo feeds hold a closed file and cannot be pickled
+            feed["bozo_exception"] = str(feed["bozo_exception"])
+        artifact = {
+            "options": options,
+            "feed": feed,
+            "languages": languages,
+            "articles": articles,
+        }
+        try:
+            tmp_path = artifact_path.with_suffix(".tmp")
+            with open(tmp_path, "wb") as f:
+                pickle.dump(artifact, f, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(tmp_path, artifact_path)
+        except Exception as e:
+            logging.warning("save_feed_artifact %s: %s", o_feed.sid, str(e))
+        # callers modify their feed in place
+        try:
+            return pickle.loads(pickle.dumps(artifact))
+        except Exception as e:
+            logging.warning("copy_feed_artifact %s: %s", o_feed.sid, str(e))
+            return copy.deepcopy(artifact)
+
+
+def entry_index_salt(obj: T_Feed) -> str:
+    """Every option that changes the rendered entry, so the index is rebuilt when one of them changes"""
+    o_feed = obj.o_feed
+    return "|".join(
+        str(value)
+        for value in (
+            obj.language,
+            obj.translate_title,
+            obj.translate_content,
+            obj.summary,
+            obj.skip_same_language,
+            o_feed.content_type_id,
+            o_feed.object_id,
+            o_feed.content_type_summary_id,
+            o_feed.object_id_summary,
+            o_feed.summary_detail,
+            o_feed.summary_mode,
+            o_feed.translation_display,
+            o_feed.quality,
+            o_feed.fetch_article,
+        )
+    )
+
+
+def entry_key(entry, index_salt: str) -> str:
+    return str(
+        cityhash.CityHash128(
+            "|".join(
+                (
+                    str(entry.get("id") or entry.get("link", "")),
+                    str(entry.get("updated") or entry.get("published", "")),
+                    index_salt,
+                )
+            )
+        )
+    )
+
+
+def save_entry_index(obj: T_Feed, index: dict):
+    try:
+        with transaction.atomic():
+            obj.t_feed_entry_set.exclude(key__in=index.keys()).delete()
+            existing = set(
+                obj.t_feed_entry_set.values_list("key", flat=True)
+            )
+            T_Feed_Entry.objects.bulk_create(
+                T_Feed_Entry(t_feed=obj, key=key, **values)
+                for key, values in index.items()
+                if key not in existing
+            )
+    except Exception as e:
+        logging.error("save_entry_index %s: %s", obj.sid, str(e))
 
 
 def translate_feed(
@@ -240,10 +552,17 @@ def translate_feed(
     summary: bool,
     summary_detail: float,
     summary_engine: TranslatorEngine,
+    summary_mode: int = 0,
     max_posts: int = 20,
     translation_display: int = 0,
     quality: bool = False,
     fetch_article: bool = False,
+    entry_index: Optional[dict] = None,
+    index_salt: str = "",
+    skip_same_language: bool = False,
+    feed_key: str = "",
+    languages: Optional[dict] = None,
+    articles: Optional[dict] = None,
 ) -> dict:
     logging.info(
         "Call task translate_feed: %s(%s items)", target_language, len(feed.entries)
@@ -251,47 +570,76 @@ def translate_feed(
     translated_feed = feed
     total_tokens = 0
     translated_characters = 0
-    need_cache_objs = {}
-    source_language = "auto"
+    skipped = 0
+    entry_index = entry_index or {}
+    new_index = {}
+    title_cache = {}
 
-    try:
-        for entry in translated_feed.entries[:max_posts]:
+    def translate_entry(entry) -> dict:
+        need_cache_objs = {}
+        tokens_used = 0
+        characters_used = 0
+        completed = True  # only completed entries are indexed, failed ones are retried next time
+        content_tree = None  # html tree of the entry content, shared by the content and summary stages
+        same_language = False
+        try:
             title = entry.get("title")
-            source_language = text_handler.detect_language(entry)
-            
+            detected = (languages or {}).get(entry_id(entry))
+            source_language, confidence = detected or text_handler.detect_language_confidence(entry, feed_key)
+            if skip_same_language:
+                # the feed prior is only a hint for the engine, skipping needs the entry's own detection
+                language, confidence = text_handler.detect_language_confidence(entry, feed_key, exact=True)
+                same_language = text_handler.is_target_language(
+                    language, confidence, target_language, settings.SKIP_LANGUAGE_CONFIDENCE
+                )
+            if same_language:
+                logging.info("[Entry] Already in %s (%.2f), pass through: %s", target_language, confidence, title)
+
             # Translate title
-            if title and translate_engine and translate_title:
-                cached = Translated_Content.is_translated(
-                    title, target_language
-                )  # check cache db
+            if title and translate_engine and translate_title and not same_language:
+                cached = title_cache.get(title)  # check cache db
                 translated_text = ""
                 if not cached:
-                    max_retries = 3
-                    for attempt in range(max_retries):
-                        results = translate_engine.translate(
-                            title, target_language=target_language, source_language=source_language, text_type="title"
-                        )
-                        translated_text = results.get("text", "")
-                        if translated_text:
-                            break
-                        logging.warning(f"Empty translation for title, retrying (attempt {attempt + 1}/{max_retries})")
-                    
+
+                    def request_title() -> dict:
+                        max_retries = 3
+                        for attempt in range(max_retries):
+                            with engine_call(translate_engine, title):
+                                results = translate_engine.translate(
+                                    title, target_language=target_language, source_language=source_language, text_type="title"
+                                )
+                            if results.get("text"):
+                                break
+                            logging.warning(f"Empty translation for title, retrying (attempt {attempt + 1}/{max_retries})")
+                        return results
+
+                    # identical titles in flight (e.g. syndicated posts) share one engine call
+                    results, shared = translation_flight.do(
+                        Translated_Content.make_hash(title, target_language), request_title
+                    )
+                    translated_text = results.get("text", "")
+
                     if not translated_text:
                         translated_text = title  # Fallback to original title if all retries fail
-                    
-                    total_tokens += results.get("tokens", 0)
-                    translated_characters += len(title)
-                    if title and translated_text:
-                        logging.info("[Title] Will cache:%s", translated_text)
-                        hash128 = cityhash.CityHash128(f"{title}{target_language}")
-                        need_cache_objs[hash128] = Translated_Content(
-                            hash=str(hash128),
-                            original_content=title,
-                            translated_language=target_language,
-                            translated_content=translated_text,
-                            tokens=results.get("tokens", 0),
-                            characters=results.get("characters", 0),
-                        )
+                        completed = False
+
+                    if shared:
+                        logging.info("[Title] Use in-flight translation:%s", translated_text)
+                    else:
+                        # the engine is billed once, by the caller that made the request
+                        characters_used += len(title)
+                        tokens_used += results.get("tokens", 0)
+                        if results.get("text"):  # never cache the fallback to the original title
+                            logging.info("[Title] Will cache:%s", translated_text)
+                            hash128 = cityhash.CityHash128(f"{title}{target_language}")
+                            need_cache_objs[hash128] = Translated_Content(
+                                hash=str(hash128),
+                                original_content=title,
+                                translated_language=target_language,
+                                translated_content=translated_text,
+                                tokens=results.get("tokens", 0),
+                                characters=results.get("characters", 0),
+                            )
                 else:
                     logging.info("[Title] Use db cache:%s", cached["text"])
                     translated_text = cached["text"]
@@ -306,16 +654,16 @@ def translate_feed(
                 need_cache_objs = {}
 
             if fetch_article:
-                try:
-                    article = newspaper.article(
-                        entry.get("link")
-                    )  # 勿使用build，因为不支持跳转
-                    entry["content"] = [{"value": mistune.html(article.text)}]
-                except Exception as e:
-                    logging.warning("Fetch original article error:%s", e)
+                article = (
+                    articles.get(entry_id(entry))
+                    if articles is not None
+                    else fetch_article_html(entry.get("link"))
+                )
+                if article:
+                    entry["content"] = [{"value": article}]
 
             # Translate content
-            if translate_engine and translate_content:
+            if translate_engine and translate_content and not same_language:
                 original_content = entry.get("content")
                 content = (
                     original_content[0].get("value")
@@ -326,20 +674,30 @@ def translate_feed(
                 if content:
                     max_retries = 3
                     for attempt in range(max_retries):
-                        translated_summary, tokens, characters, need_cache = (
+                        # parsed once, translated in place and reused by the summary below
+                        content_tree = text_handler.parse_html(content)
+                        translated_summary, tokens, characters, need_cache, failed_segments = (
                             content_translate(
-                                content, target_language, translate_engine, quality, source_language=source_language
+                                content, target_language, translate_engine, quality, source_language=source_language, tree=content_tree
                             )
                         )
                         if translated_summary:
                             break
                         logging.warning(f"Empty translation for content, retrying (attempt {attempt + 1}/{max_retries})")
-                    
+
                     if not translated_summary:
                         translated_summary = content  # Fallback to original content if all retries fail
-                    
-                    total_tokens += tokens
-                    translated_characters += characters
+                        completed = False
+                        content_tree = None
+                    elif failed_segments:
+                        # partly translated, not indexed so the next poll retries the missing parts
+                        logging.warning("[Content] %d segments left untranslated", failed_segments)
+                        completed = False
+                    if translation_display != 0:
+                        content_tree = None  # the entry holds both versions, not just the tree
+
+                    tokens_used += tokens
+                    characters_used += characters
 
                     need_cache_objs.update(need_cache)
 
@@ -356,9 +714,6 @@ def translate_feed(
                     need_cache_objs = {}
 
             if summary_engine and summary:
-                if summary_engine == None:
-                    logging.warning("No Summarize engine")
-                    continue
                 original_content = entry.get("content")
                 content = (
                     original_content[0].get("value")
@@ -367,50 +722,131 @@ def translate_feed(
                 )
 
                 if content:
+                    if content_tree is None:
+                        content_tree = text_handler.parse_html(content)
+                    summary_source = text_handler.html_to_text(content_tree)
                     max_retries = 3
                     for attempt in range(max_retries):
                         summary_text, tokens, need_cache = content_summarize(
                             content,
+                            text=summary_source,
                             target_language=target_language,
                             detail=summary_detail,
                             engine=summary_engine,
+                            summary_mode=summary_mode,
                             minimum_chunk_size=summary_engine.max_size(),
                         )
                         if summary_text:
                             break
                         logging.warning(f"Empty summary, retrying (attempt {attempt + 1}/{max_retries})")
-                    
+
                     if not summary_text:
                         summary_text = content  # Fallback to original content if all retries fail
-                    
-                    total_tokens += tokens
+                        completed = False
+
+                    tokens_used += tokens
                     need_cache_objs.update(need_cache)
                     html_summary = f"<br />🤖:{mistune.html(summary_text)}<br />---------------<br />"
 
                     entry["summary"] = summary_text
                     entry["content"] = [{"value": html_summary + content}]
+        except Exception as e:
+            logging.error("translate_feed: %s", str(e))
+            completed = False
+        finally:
+            bulk_save_cache(need_cache_objs)
+
+        return {
+            "tokens": tokens_used,
+            "characters": characters_used,
+            "completed": completed,
+            "skipped": same_language,
+        }
+
+    entries = translated_feed.entries[:max_posts]
+    keys = [entry_key(entry, index_salt) for entry in entries]
+    pending = []
+    for key, entry in zip(keys, entries):
+        indexed = entry_index.get(key)
+        if indexed:
+            # unchanged entry, splice the previous output
+            entry["title"] = indexed["title"]
+            entry["summary"] = indexed["summary"]
+            if indexed["content"] is not None:
+                entry["content"] = [{"value": indexed["content"]}]
+            new_index[key] = indexed
+        else:
+            pending.append((key, entry))
 
-                    bulk_save_cache(need_cache_objs)
-                    need_cache_objs = {}
-
+    try:
+        if pending and translate_engine and translate_title:
+            # resolve the titles of all entries with a few queries instead of one per title
+            title_cache = Translated_Content.lookup_many(
+                (entry.get("title") for _, entry in pending), target_language
+            )
     except Exception as e:
         logging.error("translate_feed: %s", str(e))
-    finally:
-        bulk_save_cache(need_cache_objs)
-        need_cache_objs = {}
+
+    # entries are translated concurrently within the engines' limits, results keep the feed order
+    max_workers = max(
+        getattr(translate_engine, "max_concurrency", 1),
+        getattr(summary_engine, "max_concurrency", 1),
+    )
+    results = ordered_map(
+        translate_entry, (entry for _, entry in pending), max_workers
+    )
+    failed = 0
+    for (key, entry), result in zip(pending, results):
+        total_tokens += result["tokens"]
+        translated_characters += result["characters"]
+        skipped += result["skipped"]
+        if result["completed"]:
+            content = entry.get("content")
+            new_index[key] = {
+                "title": entry.get("title"),
+                "summary": entry.get("summary"),
+                "content": content[0].get("value") if content else None,
+            }
+        else:
+            failed += 1
 
     return {
         "feed": translated_feed,
         "tokens": total_tokens,
         "characters": translated_characters,
+        "skipped": skipped,
+        "failed": failed,
+        "index": new_index,
     }
 
 
+def ordered_map(fn, items, max_workers: int = 1) -> list:
+    """
+    Like map(), but runs on a thread pool of max_workers. Results keep the input order.
+    Pool threads close their own db connections when done.
+    """
+    items = list(items)
+    if max_workers <= 1 or len(items) <= 1:
+        return [fn(item) for item in items]
+
+    def run(item):
+        try:
+            return fn(item)
+        finally:
+            connections.close_all()
+
+    with ThreadPoolExecutor(max_workers=min(max_workers, len(items))) as executor:
+        return list(executor.map(run, items))
+
+
 def bulk_save_cache(need_cache_objs):
     try:
         if need_cache_objs:
             logging.info("Save caches to db")
-            Translated_Content.objects.bulk_create(need_cache_objs.values())
+            for obj in need_cache_objs.values():
+                translation_cache.set(obj.hash, obj.to_cache())
+            # rows written meanwhile by another task for the same text are left as they are
+            Translated_Content.objects.bulk_create(need_cache_objs.values(), ignore_conflicts=True)
     except IntegrityError:
         logging.warning("Save cache: A record with this hash value already exists.")
     except Exception as e:
@@ -423,35 +859,73 @@ def content_translate(
     target_language: str,
     engine: TranslatorEngine,
     quality: bool = False,
-    source_language:str = "auto"
+    source_language:str = "auto",
+    tree=None,
 ):
+    """
+    Translate the html content, return (html, tokens, characters, need_cache_objs, failed).
+    failed counts the units left in the original language (and is 1 on an error).
+    tree is the parse_html() tree of original_content if the caller already has it,
+    it is translated in place.
+    """
     total_tokens = 0
     total_characters = 0
+    failed = 0
     need_cache_objs = {}
-    soup = BeautifulSoup(original_content, "lxml")
+    if tree is None:
+        tree = text_handler.parse_html(original_content)
 
     try:
         if quality:
-            soup = BeautifulSoup(text_handler.unwrap_tags(soup), "lxml")
-
-        for element in soup.find_all(string=True):
-            if text_handler.should_skip(element):
-                continue
-            # TODO 如果文字长度大于最大长度，就分段翻译，需要用chunk_translate
-            text = element.get_text()
+            text_handler.unwrap_tags(tree)
 
-            logging.info("[Content] Translate: %s...", text)
-            cached = Translated_Content.is_translated(text, target_language)
-
-            if not cached:
-                results = engine.translate(
-                    text, target_language=target_language, source_language=source_language, text_type="content"
+        def translate_units(segments) -> list:
+            """Translate the units into the tree, return the runs whose placeholders were lost"""
+            nonlocal total_tokens, total_characters, failed
+            caches = Translated_Content.lookup_many(
+                (segment.text for segment in segments), target_language
+            )
+            uncached = list(
+                dict.fromkeys(
+                    segment.text for segment in segments if segment.text not in caches
                 )
-                total_tokens += results.get("tokens", 0)
-                total_characters += len(text)
+            )
+            translated, tokens = translate_segments(
+                engine,
+                uncached,
+                target_language,
+                source_language=source_language,
+                user_prompt=(
+                    text_handler.INLINE_TAG_PROMPT
+                    if any(segment.tags for segment in segments)
+                    else None
+                ),
+            )
+            total_tokens += tokens
+
+            lost = []
+            for segment in segments:
+                text = segment.text
+                cached = caches.get(text)
+                if cached:
+                    logging.info("[Content] Use db cache:%s", text)
+                    results = cached
+                else:
+                    logging.info("[Content] Translate: %s...", text)
+                    results = translated.get(text) or {"text": ""}
+                    if not results.get("shared"):
+                        total_characters += len(text)
 
-                if results["text"]:
+                if not results.get("text"):
+                    failed += 1  # the original text stays in the tree
+                    continue
+                if not text_handler.restore_segment(segment, results["text"]):
+                    lost.append(segment)
+                    continue
+                # only translations whose placeholders were decoded are cached
+                if not cached and not results.get("shared"):
                     logging.info("[Content] Will cache:%s", results["text"])
+                    caches[text] = results  # repeated text nodes in the same content
                     hash128 = cityhash.CityHash128(f"{text}{target_language}")
                     need_cache_objs[hash128] = Translated_Content(
                         hash=str(hash128),
@@ -461,15 +935,169 @@ def content_translate(
                         tokens=results.get("tokens", 0),
                         characters=results.get("characters", 0),
                     )
+            return lost
 
-                element.string.replace_with(results.get("text", text))
-            else:
-                logging.info("[Content] Use db cache:%s", text)
-                element.string.replace_with(cached.get("text"))
+        # AI engines get whole inline runs with placeholder tags, the others one text node at a time
+        lost = translate_units(text_handler.segment_blocks(tree, inline=engine.is_ai))
+        if lost:
+            logging.warning("[Content] Inline tags lost in translation, translate %d runs node by node", len(lost))
+            translate_units([unit for segment in lost for unit in text_handler.split_run(segment)])
     except Exception as e:
         logging.error(f"content_translate: {str(e)}")
+        failed += 1
+
+    return text_handler.serialize_html(tree), total_tokens, total_characters, need_cache_objs, failed
 
-    return str(soup), total_tokens, total_characters, need_cache_objs
+
+def translate_segments(
+    engine: TranslatorEngine,
+    texts: list,
+    target_language: str,
+    source_language: str = "auto",
+    text_type: str = "content",
+    user_prompt: str = None,
+):
+    """
+    Translate a list of uncached texts, return ({text: results}, tokens).
+
+    Engines with a native batch endpoint (batch_size) get the texts through
+    translate_many(), as many per request as batch_size and max_size() allow.
+    AI engines get the texts packed into as few requests as max_size() allows,
+    wrapped in <segN> markers to map the results back. A batch whose markers
+    do not survive the round trip is retried one text at a time.
+    """
+
+    def translate_single(group_texts):
+        translated = {}
+        tokens = 0
+        for text in group_texts:
+            with engine_call(engine, text):
+                results = engine.translate(
+                    text,
+                    target_language=target_language,
+                    source_language=source_language,
+                    text_type=text_type,
+                    user_prompt=user_prompt,
+                )
+            tokens += results.get("tokens", 0)
+            translated[text] = results
+        return translated, tokens
+
+    def translate_batch(group_texts):
+        logging.info("[Content] Translate %d texts in one batch", len(group_texts))
+        with engine_call(engine, "".join(group_texts)):
+            results = engine.translate_many(
+                group_texts,
+                target_language=target_language,
+                source_language=source_language,
+                text_type=text_type,
+            )
+        tokens = results.get("tokens", 0)
+        translated_texts = results.get("texts", [])
+        if len(translated_texts) != len(group_texts):
+            logging.warning("[Content] Batch result size mismatch, translate one by one")
+            translated, single_tokens = translate_single(group_texts)
+            return translated, tokens + single_tokens
+        return {
+            text: {"text": translated_text, "characters": len(text)}
+            for text, translated_text in zip(group_texts, translated_texts)
+        }, tokens
+
+    def translate_packed(group_texts):
+        if len(group_texts) == 1:
+            return translate_single(group_texts)
+
+        logging.info("[Content] Translate %d segments in one request", len(group_texts))
+        packed = text_handler.join_segments(group_texts)
+        with engine_call(engine, packed):
+            results = engine.translate(
+                packed,
+                target_language=target_language,
+                source_language=source_language,
+                text_type=text_type,
+                user_prompt=(
+                    f"{text_handler.SEGMENT_PROMPT}\n{user_prompt}"
+                    if user_prompt
+                    else text_handler.SEGMENT_PROMPT
+                ),
+            )
+        tokens = results.get("tokens", 0)
+        segments = text_handler.split_segments(results.get("text", ""), len(group_texts))
+        if segments is None:
+            logging.warning("[Content] Segment markers lost, translate one by one")
+            translated, single_tokens = translate_single(group_texts)
+            return translated, tokens + single_tokens
+
+        translated = {}
+        for text, segment in zip(group_texts, segments):
+            # keep the surrounding whitespace of inline text nodes
+            leading = text[: len(text) - len(text.lstrip())]
+            trailing = text[len(text.rstrip()) :]
+            translated[text] = {
+                "text": f"{leading}{segment}{trailing}",
+                "tokens": tokens // len(group_texts),
+                "characters": len(text),
+            }
+        return translated, tokens
+
+    def translate_texts(texts):
+        if engine.batch_size and len(texts) > 1:
+            groups = text_handler.pack_segments(
+                texts, max(int(engine.max_size()), 1), max_count=engine.batch_size
+            )
+            translate_group = translate_batch
+        elif engine.is_ai and len(texts) > 1:
+            # max_size() bounds the response too, keep half of it for the translated text
+            size_fn = text_handler.count_tokens if hasattr(engine, "max_tokens") else len
+            groups = text_handler.pack_segments(
+                texts, max(int(engine.max_size() // 2), 1), size_fn
+            )
+            translate_group = translate_packed
+        else:
+            groups = [[i] for i in range(len(texts))]
+            translate_group = translate_single
+
+        translated = {}
+        total_tokens = 0
+        for group_translated, tokens in ordered_map(
+            translate_group,
+            ([texts[i] for i in group] for group in groups),
+            engine.max_concurrency,
+        ):
+            translated.update(group_translated)
+            total_tokens += tokens
+        return translated, total_tokens
+
+    # texts already being translated by another task or feed are waited for, not sent again
+    keys = {text: Translated_Content.make_hash(text, target_language) for text in texts}
+    owned, waiting = {}, {}
+    for text in texts:
+        leader, flight = translation_flight.claim(keys[text])
+        (owned if leader else waiting)[text] = flight
+
+    translated = {}
+    total_tokens = 0
+    try:
+        translated, total_tokens = translate_texts(list(owned))
+    finally:
+        for text, flight in owned.items():
+            translation_flight.resolve(keys[text], flight, translated.get(text))
+
+    leftover = []
+    for text, flight in waiting.items():
+        results = translation_flight.wait(flight)
+        if results is None:
+            leftover.append(text)
+        else:
+            # shared results are not paid for and are saved to the cache by their leader
+            translated[text] = {**results, "tokens": 0, "shared": True}
+    if leftover:
+        leftover_translated, tokens = translate_texts(leftover)
+        translated.update(leftover_translated)
+        total_tokens += tokens
+    if waiting:
+        logging.info("[Content] %d/%d segments shared with in-flight requests", len(waiting) - len(leftover), len(texts))
+    return translated, total_tokens
 
 
 def content_summarize(
@@ -480,6 +1108,8 @@ def content_summarize(
     minimum_chunk_size: Optional[int] = 500,
     chunk_delimiter: str = ".",
     summarize_recursively=True,
+    summary_mode: int = 0,
+    text: Optional[str] = None,
 ):
     # check detail is set correctly
     assert 0 <= detail <= 1
@@ -488,51 +1118,61 @@ def content_summarize(
     need_cache_objs = {}
     final_summary = ""
     try:
-        text = text_handler.clean_content(original_content)
+        # text of original_content, if the caller already has its tree
+        if text is None:
+            text = text_handler.html_to_text(text_handler.parse_html(original_content))
         logging.info("[Summarize]: %s...", text)
         cached = Translated_Content.is_translated(
             f"Summary_{original_content}", target_language
         )
 
         if not cached:
+            # tokenize once, both chunking passes reuse the token counts
+            pieces, counts = text_handler.split_tokens(text, chunk_delimiter)
             # interpolate the number of chunks based to get specified level of detail
             max_chunks = len(
-                text_handler.chunk_on_delimiter(
-                    text, minimum_chunk_size, chunk_delimiter
-                )
+                text_handler.chunk_by_tokens(pieces, counts, minimum_chunk_size)[0]
             )
             min_chunks = 1
             num_chunks = int(min_chunks + detail * (max_chunks - min_chunks))
 
             # adjust chunk_size based on interpolated number of chunks
-            document_length = len(text_handler.tokenize(text))
+            document_length = sum(counts)
             chunk_size = max(minimum_chunk_size, document_length // num_chunks)
-            text_chunks = text_handler.chunk_on_delimiter(
-                text, chunk_size, chunk_delimiter
+            text_chunks, chunk_counts = text_handler.chunk_by_tokens(
+                pieces, counts, chunk_size
             )
 
             logging.info(
-                "Splitting the text into %d chunks to be summarized.", len(text_chunks)
+                "Splitting the text (%d tokens) into %d chunks to be summarized.",
+                document_length,
+                len(text_chunks),
             )
-            # logging.info(f"Chunk lengths are {[len(text_handler.tokenize(x)) for x in text_chunks]}")
-
-            accumulated_summaries = []
-            for chunk in text_chunks:
-                if summarize_recursively and accumulated_summaries:
-                    # Creating a structured prompt for recursive summarization
-                    accumulated_summaries_string = "\n\n".join(accumulated_summaries)
-                    user_message_content = f"Previous summaries:\n\n{accumulated_summaries_string}\n\nText to summarize next:\n\n{chunk}"
-                else:
-                    # Directly passing the chunk for summarization without recursive context
-                    user_message_content = chunk
-
-                # Assuming this function gets the completion and works as expected
-                response = engine.summarize(user_message_content, target_language)
-                accumulated_summaries.append(response.get("text"))
-                total_tokens += response.get("tokens", 0)
+            logging.debug("Chunk lengths are %s", chunk_counts)
 
-            # Compile final summary from partial summaries
-            final_summary = "<br/>".join(accumulated_summaries)
+            if summary_mode == 1 and len(text_chunks) > 1:
+                final_summary, total_tokens = summarize_map_reduce(
+                    text_chunks, target_language, engine
+                )
+            else:
+                accumulated_summaries = []
+                for chunk in text_chunks:
+                    if summarize_recursively and accumulated_summaries:
+                        # Creating a structured prompt for recursive summarization
+                        accumulated_summaries_string = "\n\n".join(accumulated_summaries)
+                        user_message_content = f"Previous summaries:\n\n{accumulated_summaries_string}\n\nText to summarize next:\n\n{chunk}"
+                    else:
+                        # Directly passing the chunk for summarization without recursive context
+                        user_message_content = chunk
+
+                    # Assuming this function gets the completion and works as expected
+                    with engine_call(engine, user_message_content):
+                        response = engine.summarize(user_message_content, target_language)
+                    accumulated_summaries.append(response.get("text"))
+                    total_tokens += response.get("tokens", 0)
+
+                # Compile final summary from partial summaries
+                final_summary = "<br/>".join(accumulated_summaries)
 
             hash128 = cityhash.CityHash128(
                 f"Summary_{original_content}{target_language}"
@@ -555,6 +1195,33 @@ def content_summarize(
     return final_summary, total_tokens, need_cache_objs
 
 
+def summarize_map_reduce(text_chunks: list, target_language: str, engine: TranslatorEngine):
+    """
+    Summarize the chunks independently, in parallel within the engine's concurrency limit,
+    then combine the partial summaries with a single reduce call.
+    Return (summary, tokens).
+    """
+
+    def summarize_chunk(chunk):
+        with engine_call(engine, chunk):
+            return engine.summarize(chunk, target_language)
+
+    responses = ordered_map(summarize_chunk, text_chunks, engine.max_concurrency)
+    partial_summaries = [response.get("text") for response in responses if response.get("text")]
+    total_tokens = sum(response.get("tokens", 0) for response in responses)
+    if len(partial_summaries) != len(text_chunks):
+        logging.warning("[Summary] %d/%d chunk summaries are empty", len(text_chunks) - len(partial_summaries), len(text_chunks))
+    if len(partial_summaries) <= 1:
+        return "".join(partial_summaries), total_tokens
+
+    combined = "\n\n".join(partial_summaries)
+    user_message_content = f"Summaries of consecutive parts of one article:\n\n{combined}"
+    with engine_call(engine, user_message_content):
+        response = engine.summarize(user_message_content, target_language)
+    total_tokens += response.get("tokens", 0)
+    return response.get("text") or "<br/>".join(partial_summaries), total_tokens
+
+
 """
 def chunk_translate(original_content: str, target_language: str, engine: TranslatorEngine):
     logging.info("Call chunk_translate: %s(%s items)", target_language, len(original_content))
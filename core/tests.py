@@ -1,3 +1,273 @@
-from django.test import TestCase
+import os
+import tempfile
+import time
+from datetime import timedelta
+from unittest import mock
 
-# Create your tests here.
+from django.test import SimpleTestCase, TestCase
+from django.utils import timezone
+from huey import SqliteHuey
+import tiktoken
+
+from utils import text_handler
+from utils.language_detector import LanguageDetector
+from .leases import TaskLease, lease_key
+from .models import Task_Lease
+from .task_index import TaskIndex
+
+
+class TaskLeaseTests(TestCase):
+    def test_acquire_skips_held_keys(self):
+        with TaskLease("a", "b") as held:
+            self.assertEqual(held, ["a", "b"])
+            self.assertEqual(TaskLease("b", "c").acquire(), ["c"])
+        self.assertEqual(set(Task_Lease.objects.values_list("key", flat=True)), {"c"})
+
+    def test_release_frees_keys(self):
+        lease = TaskLease("a")
+        lease.acquire()
+        lease.release()
+        self.assertFalse(Task_Lease.objects.exists())
+        with TaskLease("a") as held:
+            self.assertEqual(held, ["a"])
+
+    def test_expired_lease_is_taken_over(self):
+        dead = TaskLease("a")
+        dead.acquire()
+        Task_Lease.objects.filter(key="a").update(
+            expires_at=timezone.now() - timedelta(seconds=1)
+        )
+        with TaskLease("a") as held:
+            self.assertEqual(held, ["a"])
+            # the dead worker comes back, it must not drop the new owner's lease
+            dead.release()
+            self.assertTrue(Task_Lease.objects.filter(key="a").exists())
+
+    def test_renew_extends_only_own_leases(self):
+        lease = TaskLease("a", ttl=60)
+        lease.acquire()
+        Task_Lease.objects.filter(key="a").update(expires_at=timezone.now())
+        lease.renew()
+        self.assertGreater(
+            Task_Lease.objects.get(key="a").expires_at,
+            timezone.now() + timedelta(seconds=30),
+        )
+        Task_Lease.objects.filter(key="a").update(owner="other")
+        with self.assertLogs(level="WARNING"):
+            lease.renew()
+        lease.release()
+        self.assertTrue(Task_Lease.objects.filter(key="a", owner="other").exists())
+
+    def test_lease_key(self):
+        self.assertEqual(lease_key("update_original_feed", "abc"), "update_original_feed:abc")
+
+
+class TaskIndexTests(SimpleTestCase):
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.huey = SqliteHuey(filename=os.path.join(tmp.name, "tasks.db"), results=False)
+        self.other = SqliteHuey(
+            name="other", filename=os.path.join(tmp.name, "other.db"), results=False
+        )
+        self.task = self.huey.task()(lambda sid, force=False: sid)
+        self.other_task = self.other.task()(lambda sid, force=False: sid)
+        self.index = TaskIndex(self.huey, self.other)
+
+    def test_schedule_dedupes_same_sid(self):
+        task_id = self.index.schedule(self.task, ("a",), delay=60)
+        self.assertIsNotNone(task_id)
+        self.assertIsNone(self.index.schedule(self.task, ("a",), delay=120))
+        self.assertEqual(self.index.get("a")["id"], task_id)
+        self.assertEqual(self.huey.pending_count(), 1)
+
+    def test_earlier_or_forced_task_replaces_queued_one(self):
+        first = self.index.schedule(self.task, ("a",), delay=60)
+        second = self.index.schedule(self.task, ("a",), delay=10)
+        self.assertNotEqual(first, second)
+        self.assertTrue(self.huey.is_revoked(first))
+        forced = self.index.schedule(self.task, ("a", True), delay=30)
+        self.assertIsNotNone(forced)
+        self.assertTrue(self.huey.is_revoked(second))
+        # a forced task covers a later plain one
+        self.assertIsNone(self.index.schedule(self.task, ("a", False), delay=60))
+        self.assertEqual(self.index.get("a")["args"], ["a", True])
+
+    def test_revoke_uses_the_task_queue(self):
+        task_id = self.index.schedule(self.other_task, ("a",), delay=60)
+        self.assertEqual(self.index.get("a")["queue"], "other")
+        self.index.revoke("a")
+        self.assertIsNone(self.index.get("a"))
+        self.assertTrue(self.other.is_revoked(task_id))
+        self.assertFalse(self.huey.is_revoked(task_id))
+
+    def test_discard_keeps_newer_task(self):
+        self.index.put("a", "new", time.time(), ("a",))
+        self.index.discard("a", "old")
+        self.assertEqual(self.index.get("a")["id"], "new")
+        self.index.discard("a", "new")
+        self.assertIsNone(self.index.get("a"))
+
+    def test_stale_entry_is_ignored(self):
+        self.index.put("a", "old", time.time() - TaskIndex.stale_after - 1, ("a",))
+        self.assertIsNone(self.index.get("a"))
+        self.assertIsNotNone(self.index.schedule(self.task, ("a",), delay=60))
+
+
+class SegmentTests(SimpleTestCase):
+    html = (
+        '<div><p>Hello <a href="/x" class="l">big <b>bold</b> world</a> and more<br>line 2.</p>'
+        "<p>Only text</p><pre>code here</pre></div>"
+    )
+
+    def segments(self):
+        root = text_handler.parse_html(self.html)
+        return root, text_handler.segment_blocks(root)
+
+    def test_inline_run_is_one_placeholder_segment(self):
+        _, segments = self.segments()
+        self.assertEqual(
+            [segment.text for segment in segments],
+            ["Hello <g1>big <g2>bold</g2> world</g1> and more<g3/>line 2.", "Only text"],
+        )
+
+    def test_placeholder_round_trip(self):
+        root, segments = self.segments()
+        for segment in segments:
+            self.assertTrue(text_handler.restore_segment(segment, segment.text.upper()))
+        self.assertEqual(
+            text_handler.serialize_html(root),
+            '<div><p>HELLO <a href="/x" class="l">BIG <b>BOLD</b> WORLD</a> AND MORE<br>LINE 2.</p>'
+            "<p>ONLY TEXT</p><pre>code here</pre></div>",
+        )
+
+    def test_reordered_placeholders_are_restored(self):
+        root, segments = self.segments()
+        translation = "<g1><g2>gras</g2> grand monde</g1> bonjour et plus<g3/>ligne 2."
+        self.assertTrue(text_handler.restore_segment(segments[0], translation))
+        self.assertIn(
+            '<p><a href="/x" class="l"><b>gras</b> grand monde</a> bonjour et plus<br>ligne 2.</p>',
+            text_handler.serialize_html(root),
+        )
+
+    def test_lost_placeholders_leave_tree_untouched(self):
+        for translation in (
+            "Bonjour gros gras monde et plus ligne 2.",  # tags dropped
+            "Bonjour <g1>gros <g2>gras</g1> monde</g2><g3/>",  # crossed
+            "Bonjour <g1>gros</g1> <g1>gras</g1><g2></g2><g3/>",  # duplicated
+            "Bonjour <g4>gros</g4> <g1><g2></g2></g1><g3/>",  # unknown
+        ):
+            root, segments = self.segments()
+            before = text_handler.serialize_html(root)
+            self.assertFalse(text_handler.restore_segment(segments[0], translation))
+            self.assertEqual(text_handler.serialize_html(root), before)
+
+    def test_split_run_falls_back_to_text_nodes(self):
+        root, segments = self.segments()
+        units = text_handler.split_run(segments[0])
+        self.assertEqual(
+            [unit.text for unit in units],
+            ["Hello ", "big ", "bold", " world", " and more", "line 2."],
+        )
+        for unit in units:
+            self.assertTrue(text_handler.restore_segment(unit, unit.text.upper()))
+        self.assertIn(
+            '<p>HELLO <a href="/x" class="l">BIG <b>BOLD</b> WORLD</a> AND MORE<br>LINE 2.</p>',
+            text_handler.serialize_html(root),
+        )
+        self.assertEqual(text_handler.split_run(segments[1]), [segments[1]])
+
+
+class TranslatableTextTests(SimpleTestCase):
+    def test_skipped_tags_and_texts(self):
+        root = text_handler.parse_html(
+            "<div>Intro<pre>code <b>here</b></pre>after pre<!-- note -->after comment"
+            '<p><code>x=1</code> is code, <span class="katex">m</span> ok</p>'
+            "<ul><li>12345</li><li>https://example.com</li><li>me@example.com</li></ul></div>"
+        )
+        self.assertEqual(
+            [text_handler.get_slot(slot) for slot in text_handler.iter_translatable(root)],
+            ["Intro", "after pre", "after comment", " is code, ", " ok"],
+        )
+
+
+# one token per byte, so the tests need no downloaded encoding
+BYTE_ENCODING = tiktoken.Encoding(
+    "bytes",
+    pat_str=r"[\s\S]",
+    mergeable_ranks={bytes([i]): i for i in range(256)},
+    special_tokens={},
+)
+
+
+@mock.patch.object(text_handler, "get_encoding", lambda model="": BYTE_ENCODING)
+class ChunkTests(SimpleTestCase):
+    def test_split_tokens_keeps_delimiter(self):
+        pieces, counts = text_handler.split_tokens("aa bbb  c", " ")
+        self.assertEqual(pieces, ["aa ", "bbb ", " ", "c"])
+        self.assertEqual(counts, [3, 4, 1, 1])
+
+    def test_chunks_fill_up_to_max_tokens(self):
+        pieces, counts = text_handler.split_tokens("aa bb cc dd", " ")
+        chunks, chunk_counts = text_handler.chunk_by_tokens(pieces, counts, 6)
+        self.assertEqual(chunks, ["aa bb ", "cc dd"])
+        self.assertEqual(chunk_counts, [6, 5])
+        chunks, _ = text_handler.chunk_by_tokens(pieces, counts, 5)
+        self.assertEqual(chunks, ["aa ", "bb ", "cc dd"])
+
+    def test_oversized_piece_is_cut_on_token_boundaries(self):
+        pieces, counts = text_handler.split_tokens("aa bbbbbbb cc", " ")
+        with self.assertLogs(level="WARNING"):
+            chunks, chunk_counts = text_handler.chunk_by_tokens(pieces, counts, 3)
+        self.assertEqual(chunks, ["aa ", "bbb", "bbb", "b ", "cc"])
+        self.assertEqual(chunk_counts, [3, 3, 3, 2, 2])
+        self.assertEqual("".join(chunks), "aa bbbbbbb cc")
+
+    def test_chunk_on_delimiter(self):
+        self.assertEqual(text_handler.chunk_on_delimiter("", 10), [])
+        self.assertEqual(
+            text_handler.chunk_on_delimiter("one. two. three.", 10, ". "),
+            ["one. two. ", "three."],
+        )
+
+
+class LanguageDetectorTests(SimpleTestCase):
+    english = "The quick brown fox jumps over the lazy dog, then it runs back home for dinner."
+    chinese = "今天天气很好，我们一起去公园散步吧，顺便买点水果回家。"
+
+    def test_sample_strips_markup(self):
+        detector = LanguageDetector(sample_chars=12)
+        self.assertEqual(detector.sample("<p>Fish &amp;\n<b>chips</b> today</p>"), "Fish & chips")
+
+    def test_entry_result_is_cached(self):
+        detector = LanguageDetector()
+        entry = {"id": "1", "updated": "u1", "title": self.chinese}
+        language, probability = detector.detect_entry(entry)
+        self.assertEqual(language, "zh-cn")
+        self.assertGreater(probability, 0.5)
+        self.assertEqual(detector.detect_entry(entry), (language, probability))
+        self.assertEqual(detector.stats()["detections"], 1)
+        detector.detect_entry({**entry, "updated": "u2"})
+        self.assertEqual(detector.stats()["detections"], 2)
+
+    def test_feed_prior_skips_detection(self):
+        detector = LanguageDetector(prior_min_samples=3, prior_recheck=100)
+        for i in range(3):
+            detector.detect_entry({"id": str(i), "title": self.english}, "feed")
+        entry = {"id": "zh", "title": self.chinese}
+        self.assertEqual(detector.detect_entry(entry, "feed"), ("en", 0.0))
+        self.assertEqual(detector.detect_entry(entry, "other")[0], "zh-cn")
+        self.assertEqual(detector.detect_entry(entry, "feed", exact=True)[0], "zh-cn")
+        self.assertEqual(detector.stats()["prior_hits"], 1)
+
+    def test_prior_rechecks_periodically(self):
+        detector = LanguageDetector(prior_min_samples=1, prior_recheck=2)
+        detector.detect_entry({"id": "0", "title": self.english}, "feed")
+        entry = {"id": "zh", "title": self.chinese}
+        self.assertEqual(detector.detect_entry(entry, "feed"), ("en", 0.0))
+        self.assertEqual(detector.detect_entry(entry, "feed")[0], "zh-cn")
+
+    def test_undetectable_text(self):
+        detector = LanguageDetector()
+        with self.assertLogs(level="WARNING"):
+            self.assertEqual(detector.detect_text("12345 !!"), ("auto", 0.0))
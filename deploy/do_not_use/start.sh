@@ -11,6 +11,7 @@ fi
 
 {
 .venv/bin/python manage.py run_huey &
+.venv/bin/python manage.py run_huey_translate &
 .venv/bin/uvicorn config.asgi:application --host 0.0.0.0 &
 }
 wait
\ No newline at end of file
@@ -5,7 +5,7 @@ import os
 import sys
 
 # Apply monkey-patch if we are running the huey consumer.
-if "run_huey" in sys.argv:
+if "run_huey" in sys.argv or "run_huey_translate" in sys.argv:
     from gevent import monkey
 
     monkey.patch_all()
@@ -65,11 +65,12 @@ def prepare_django():
 
 
 def start_huey_worker():
-    """启动Huey后台任务处理器"""
+    """启动Huey后台任务处理器: 抓取队列和翻译队列各一个进程"""
     print("🚀 启动Huey任务处理器...")
-    return subprocess.Popen([
-        "uv", "run", "python", "manage.py", "run_huey", "-f"
-    ])
+    return [
+        subprocess.Popen(["uv", "run", "python", "manage.py", command, "-f"])
+        for command in ("run_huey", "run_huey_translate")
+    ]
 
 
 def start_development_server():
@@ -26,13 +26,40 @@ def setup_environment():
     for origin in os.environ["CSRF_TRUSTED_ORIGINS"].split(","):
         print(f"  - {origin}")
 
+HUEY_COMMANDS = ("run_huey", "run_huey_translate")
+
+
+def start_huey_process(command: str):
+    return subprocess.Popen(["uv", "run", "python", "manage.py", command, "-f"])
+
+
 def start_huey_worker():
-    """启动Huey后台任务处理器"""
+    """启动Huey后台任务处理器: 抓取队列和翻译队列各一个进程"""
     print("🚀 启动Huey任务处理器...")
-    process = subprocess.Popen([
-        "uv", "run", "python", "manage.py", "run_huey", "-f"
-    ])
-    return process
+    processes = {command: start_huey_process(command) for command in HUEY_COMMANDS}
+    return processes
+
+
+def monitor_processes(server_process, huey_processes: dict, interval: int = 5):
+    """等待服务器退出, 期间重启意外退出的Huey进程"""
+    while server_process.poll() is None:
+        for command, process in huey_processes.items():
+            if process.poll() is not None:
+                print(f"⚠️  {command} 已退出(code {process.returncode})，正在重启...")
+                huey_processes[command] = start_huey_process(command)
+        time.sleep(interval)
+
+
+def stop_processes(processes, timeout: int = 10):
+    """终止子进程, 超时未退出则强制结束"""
+    for process in processes:
+        if process.poll() is None:
+            process.terminate()
+    for process in processes:
+        try:
+            process.wait(timeout=timeout)
+        except subprocess.TimeoutExpired:
+            process.kill()
 
 
 def start_production_server():
@@ -154,6 +181,8 @@ def main():
     print("🔥 Django生产环境部署脚本")
     print("=" * 50)
     
+    huey_processes = {}
+    server_process = None
     try:
         # 检查是否在Django项目目录中
         if not Path("manage.py").exists():
@@ -168,17 +197,24 @@ def main():
         init_server()
         
         # 3. 启动Huey任务处理器
-        huey_process = start_huey_worker()
+        huey_processes = start_huey_worker()
         
         server_process = start_production_server()
         
         print("🌟 所有服务已启动，按 Ctrl+C 停止")
         
-        server_process.wait()
+        monitor_processes(server_process, huey_processes)
         
+    except KeyboardInterrupt:
+        print("🛑 正在停止服务...")
     except Exception as e:
         print(f"❌ 发生错误: {e}")
         sys.exit(1)
+    finally:
+        processes = list(huey_processes.values())
+        if server_process is not None:
+            processes.append(server_process)
+        stop_processes(processes)
 
 if __name__ == "__main__":
     main()
@@ -60,6 +60,9 @@ class OpenAITranslatorAdmin(BaseTranslatorAdmin):
         "frequency_penalty",
         "presence_penalty",
         "max_tokens",
+        "max_concurrency",
+        "rpm",
+        "tpm",
     ]
     list_display = [
         "name",
@@ -89,6 +92,9 @@ class AzureAITranslatorAdmin(BaseTranslatorAdmin):
         "frequency_penalty",
         "presence_penalty",
         "max_tokens",
+        "max_concurrency",
+        "rpm",
+        "tpm",
     ]
     list_display = [
         "name",
@@ -105,7 +111,7 @@ class AzureAITranslatorAdmin(BaseTranslatorAdmin):
 
 
 class DeepLTranslatorAdmin(BaseTranslatorAdmin):
-    fields = ["name", "api_key", "server_url", "proxy", "max_characters"]
+    fields = ["name", "api_key", "server_url", "proxy", "max_characters", "max_concurrency", "rpm", "tpm"]
     list_display = [
         "name",
         "is_valid",
@@ -117,18 +123,18 @@ class DeepLTranslatorAdmin(BaseTranslatorAdmin):
 
 
 class DeepLXTranslatorAdmin(BaseTranslatorAdmin):
-    fields = ["name", "deeplx_api", "interval", "max_characters"]
+    fields = ["name", "deeplx_api", "interval", "max_characters", "max_concurrency", "rpm", "tpm"]
     list_display = ["name", "is_valid", "deeplx_api", "interval", "max_characters"]
 
 
 # @admin.register(DeepLWebTranslator)
 class DeepLWebTranslatorAdmin(BaseTranslatorAdmin):
-    fields = ["name", "interval", "proxy", "max_characters"]
+    fields = ["name", "interval", "proxy", "max_characters", "max_concurrency", "rpm", "tpm"]
     list_display = ["name", "is_valid", "interval", "proxy", "max_characters"]
 
 
 class MicrosoftTranslatorAdmin(BaseTranslatorAdmin):
-    fields = ["name", "api_key", "location", "endpoint", "max_characters"]
+    fields = ["name", "api_key", "location", "endpoint", "max_characters", "max_concurrency", "rpm", "tpm"]
     list_display = [
         "name",
         "is_valid",
@@ -140,7 +146,7 @@ class MicrosoftTranslatorAdmin(BaseTranslatorAdmin):
 
 
 class CaiYunTranslatorAdmin(BaseTranslatorAdmin):
-    fields = ["name", "token", "url", "max_characters"]
+    fields = ["name", "token", "url", "max_characters", "max_concurrency", "rpm", "tpm"]
     list_display = ["name", "is_valid", "masked_api_key", "url", "max_characters"]
 
 
@@ -157,6 +163,9 @@ class GeminiTranslatorAdmin(BaseTranslatorAdmin):
         "top_k",
         "max_tokens",
         "interval",
+        "max_concurrency",
+        "rpm",
+        "tpm",
     ]
     list_display = [
         "name",
@@ -172,7 +181,7 @@ class GeminiTranslatorAdmin(BaseTranslatorAdmin):
 
 
 class GoogleTranslateWebTranslatorAdmin(BaseTranslatorAdmin):
-    fields = ["name", "base_url", "interval", "proxy", "max_characters"]
+    fields = ["name", "base_url", "interval", "proxy", "max_characters", "max_concurrency", "rpm", "tpm"]
     list_display = [
         "name",
         "is_valid",
@@ -197,6 +206,9 @@ class ClaudeTranslatorAdmin(BaseTranslatorAdmin):
         "top_k",
         "max_tokens",
         "proxy",
+        "max_concurrency",
+        "rpm",
+        "tpm",
     ]
     list_display = [
         "name",
@@ -225,6 +237,9 @@ class MoonshotAITranslatorAdmin(BaseTranslatorAdmin):
         "frequency_penalty",
         "presence_penalty",
         "max_tokens",
+        "max_concurrency",
+        "rpm",
+        "tpm",
     ]
     list_display = [
         "name",
@@ -253,6 +268,9 @@ class TogetherAITranslatorAdmin(BaseTranslatorAdmin):
         "frequency_penalty",
         "presence_penalty",
         "max_tokens",
+        "max_concurrency",
+        "rpm",
+        "tpm",
     ]
     list_display = [
         "name",
@@ -281,6 +299,9 @@ class OpenRouterAITranslatorAdmin(BaseTranslatorAdmin):
         "frequency_penalty",
         "presence_penalty",
         "max_tokens",
+        "max_concurrency",
+        "rpm",
+        "tpm",
     ]
     list_display = [
         "name",
@@ -309,6 +330,9 @@ class GroqTranslatorAdmin(BaseTranslatorAdmin):
         "frequency_penalty",
         "presence_penalty",
         "max_tokens",
+        "max_concurrency",
+        "rpm",
+        "tpm",
     ]
     list_display = [
         "name",
@@ -327,6 +351,9 @@ class FreeTranslatorsAdmin(BaseTranslatorAdmin):
         "name",
         "proxies",
         "max_characters",
+        "max_concurrency",
+        "rpm",
+        "tpm",
     ]
     list_display = [
         "name",
@@ -344,6 +371,9 @@ class DoubaoTranslatorAdmin(BaseTranslatorAdmin):
         "content_translate_prompt",
         "summary_prompt",
         "max_tokens",
+        "max_concurrency",
+        "rpm",
+        "tpm",
     ]
     list_display = [
         "name",
@@ -363,6 +393,9 @@ class OpenlTranslatorAdmin(BaseTranslatorAdmin):
         "url",
         "service_name",
         "max_characters",
+        "max_concurrency",
+        "rpm",
+        "tpm",
     ]
     list_display = [
         "name",
@@ -380,6 +413,9 @@ class KagiTranslatorAdmin(BaseTranslatorAdmin):
         "summary_type",
         "translate_prompt",
         "content_translate_prompt",
+        "max_concurrency",
+        "rpm",
+        "tpm",
     ]
     list_display = [
         "name",
@@ -415,7 +451,7 @@ class Translated_ContentAdmin(admin.ModelAdmin):
 
 
 class TestTranslatorAdmin(BaseTranslatorAdmin):
-    fields = ["name", "translated_text", "max_characters", "interval"]
+    fields = ["name", "translated_text", "max_characters", "interval", "max_concurrency", "rpm", "tpm"]
     list_display = ["name", "is_valid", "translated_text", "max_characters", "interval"]
 
 
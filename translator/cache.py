@@ -0,0 +1,91 @@
+import sys
+import threading
+from collections import OrderedDict
+from typing import Dict, Iterable, Optional
+
+from django.conf import settings
+
+
+class TranslationCache:
+    """
+    Bounded in-memory LRU in front of the Translated_Content table.
+
+    Keys are the CityHash128 strings used as Translated_Content.hash, values
+    are the {"text", "tokens", "characters"} dicts returned by the lookups.
+    The bound is on the approximate memory used by the cached texts, so a
+    few long paragraphs cannot push out thousands of short boilerplate strings
+    without accounting for it. The cache is module level, so every greenlet
+    worker of the consumer shares it.
+    """
+
+    def __init__(self, max_bytes: int):
+        self.max_bytes = max_bytes
+        self.size = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _sizeof(key: str, value: dict) -> int:
+        return sys.getsizeof(key) + sys.getsizeof(value.get("text") or "") + 64
+
+    def get(self, key: str) -> Optional[dict]:
+        with self._lock:
+            value = self._data.get(key)
+            if value is None:
+                self.misses += 1
+                return None
+            self._data.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def get_many(self, keys: Iterable[str]) -> Dict[str, dict]:
+        found = {}
+        with self._lock:
+            for key in keys:
+                value = self._data.get(key)
+                if value is None:
+                    self.misses += 1
+                    continue
+                self._data.move_to_end(key)
+                self.hits += 1
+                found[key] = value
+        return found
+
+    def set(self, key: str, value: dict):
+        if self.max_bytes <= 0:
+            return
+        item_size = self._sizeof(key, value)
+        if item_size > self.max_bytes:
+            return
+        with self._lock:
+            old = self._data.pop(key, None)
+            if old is not None:
+                self.size -= self._sizeof(key, old)
+            self._data[key] = value
+            self.size += item_size
+            while self.size > self.max_bytes:
+                old_key, old_value = self._data.popitem(last=False)
+                self.size -= self._sizeof(old_key, old_value)
+                self.evictions += 1
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+            self.size = 0
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "items": len(self._data),
+                "size": self.size,
+                "max_size": self.max_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+            }
+
+
+translation_cache = TranslationCache(settings.TRANSLATION_CACHE_MB * 1024 * 1024)
@@ -0,0 +1,64 @@
+import logging
+import threading
+
+import cityhash
+
+
+class ClientRegistry:
+    """
+    Process-wide pool of SDK clients, one per engine row.
+
+    Building an SDK client per request re-creates its HTTP connection pool
+    and redoes the TLS handshake, so the clients are kept and reused by
+    every task and worker thread. Entries are keyed by (engine class, pk) and
+    carry a fingerprint of the engine config: a changed api key, url or proxy
+    builds a new client and saving or deleting the row drops the old one.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._clients = {}
+
+    @staticmethod
+    def key(engine) -> tuple:
+        return (engine.__class__.__name__, engine.pk)
+
+    @staticmethod
+    def fingerprint(engine) -> int:
+        values = (
+            getattr(engine, field.attname)
+            for field in engine._meta.concrete_fields
+            if field.attname not in ("id", "valid")
+        )
+        return cityhash.CityHash64(repr(tuple(values)))
+
+    def get(self, engine, factory):
+        """Return the pooled client of the engine, built by factory() on first use."""
+        if engine.pk is None:  # unsaved engine, nothing to pool
+            return factory()
+        key = self.key(engine)
+        fingerprint = self.fingerprint(engine)
+        with self._lock:
+            entry = self._clients.get(key)
+            if entry is not None and entry[0] == fingerprint:
+                return entry[1]
+        client = factory()
+        with self._lock:
+            entry = self._clients.get(key)
+            if entry is not None and entry[0] == fingerprint:
+                return entry[1]  # another thread won the race, reuse its client
+            self._clients[key] = (fingerprint, client)
+        logging.info("ClientRegistry: new client for %s:%s", *key)
+        return client
+
+    def invalidate(self, engine):
+        # dropped clients are not closed, requests in flight may still use them
+        with self._lock:
+            self._clients.pop(self.key(engine), None)
+
+    def clear(self):
+        with self._lock:
+            self._clients.clear()
+
+
+client_registry = ClientRegistry()
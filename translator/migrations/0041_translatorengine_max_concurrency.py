@@ -0,0 +1,108 @@
+# Generated by Django 5.2.18 on 2026-10-18 16:55
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('translator', '0040_alter_kagitranslator_summarization_engine_and_more'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='azureaitranslator',
+            name='max_concurrency',
+            field=models.IntegerField(default=1, help_text='Max number of parallel requests sent to this engine', verbose_name='Max Concurrency'),
+        ),
+        migrations.AddField(
+            model_name='caiyuntranslator',
+            name='max_concurrency',
+            field=models.IntegerField(default=1, help_text='Max number of parallel requests sent to this engine', verbose_name='Max Concurrency'),
+        ),
+        migrations.AddField(
+            model_name='claudetranslator',
+            name='max_concurrency',
+            field=models.IntegerField(default=1, help_text='Max number of parallel requests sent to this engine', verbose_name='Max Concurrency'),
+        ),
+        migrations.AddField(
+            model_name='deepltranslator',
+            name='max_concurrency',
+            field=models.IntegerField(default=1, help_text='Max number of parallel requests sent to this engine', verbose_name='Max Concurrency'),
+        ),
+        migrations.AddField(
+            model_name='deeplwebtranslator',
+            name='max_concurrency',
+            field=models.IntegerField(default=1, help_text='Max number of parallel requests sent to this engine', verbose_name='Max Concurrency'),
+        ),
+        migrations.AddField(
+            model_name='deeplxtranslator',
+            name='max_concurrency',
+            field=models.IntegerField(default=1, help_text='Max number of parallel requests sent to this engine', verbose_name='Max Concurrency'),
+        ),
+        migrations.AddField(
+            model_name='doubaotranslator',
+            name='max_concurrency',
+            field=models.IntegerField(default=1, help_text='Max number of parallel requests sent to this engine', verbose_name='Max Concurrency'),
+        ),
+        migrations.AddField(
+            model_name='freetranslators',
+            name='max_concurrency',
+            field=models.IntegerField(default=1, help_text='Max number of parallel requests sent to this engine', verbose_name='Max Concurrency'),
+        ),
+        migrations.AddField(
+            model_name='geminitranslator',
+            name='max_concurrency',
+            field=models.IntegerField(default=1, help_text='Max number of parallel requests sent to this engine', verbose_name='Max Concurrency'),
+        ),
+        migrations.AddField(
+            model_name='googletranslatewebtranslator',
+            name='max_concurrency',
+            field=models.IntegerField(default=1, help_text='Max number of parallel requests sent to this engine', verbose_name='Max Concurrency'),
+        ),
+        migrations.AddField(
+            model_name='groqtranslator',
+            name='max_concurrency',
+            field=models.IntegerField(default=1, help_text='Max number of parallel requests sent to this engine', verbose_name='Max Concurrency'),
+        ),
+        migrations.AddField(
+            model_name='kagitranslator',
+            name='max_concurrency',
+            field=models.IntegerField(default=1, help_text='Max number of parallel requests sent to this engine', verbose_name='Max Concurrency'),
+        ),
+        migrations.AddField(
+            model_name='microsofttranslator',
+            name='max_concurrency',
+            field=models.IntegerField(default=1, help_text='Max number of parallel requests sent to this engine', verbose_name='Max Concurrency'),
+        ),
+        migrations.AddField(
+            model_name='moonshotaitranslator',
+            name='max_concurrency',
+            field=models.IntegerField(default=1, help_text='Max number of parallel requests sent to this engine', verbose_name='Max Concurrency'),
+        ),
+        migrations.AddField(
+            model_name='openaitranslator',
+            name='max_concurrency',
+            field=models.IntegerField(default=1, help_text='Max number of parallel requests sent to this engine', verbose_name='Max Concurrency'),
+        ),
+        migrations.AddField(
+            model_name='openltranslator',
+            name='max_concurrency',
+            field=models.IntegerField(default=1, help_text='Max number of parallel requests sent to this engine', verbose_name='Max Concurrency'),
+        ),
+        migrations.AddField(
+            model_name='openrouteraitranslator',
+            name='max_concurrency',
+            field=models.IntegerField(default=1, help_text='Max number of parallel requests sent to this engine', verbose_name='Max Concurrency'),
+        ),
+        migrations.AddField(
+            model_name='testtranslator',
+            name='max_concurrency',
+            field=models.IntegerField(default=1, help_text='Max number of parallel requests sent to this engine', verbose_name='Max Concurrency'),
+        ),
+        migrations.AddField(
+            model_name='togetheraitranslator',
+            name='max_concurrency',
+            field=models.IntegerField(default=1, help_text='Max number of parallel requests sent to this engine', verbose_name='Max Concurrency'),
+        ),
+    ]
@@ -0,0 +1,203 @@
+# Generated by Django 5.2.18 on 2026-10-18 16:57
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('translator', '0041_translatorengine_max_concurrency'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='azureaitranslator',
+            name='rpm',
+            field=models.IntegerField(default=0, help_text='Shared by all workers, 0 means no limit', verbose_name='Requests per Minute'),
+        ),
+        migrations.AddField(
+            model_name='azureaitranslator',
+            name='tpm',
+            field=models.IntegerField(default=0, help_text='Shared by all workers, 0 means no limit', verbose_name='Tokens per Minute'),
+        ),
+        migrations.AddField(
+            model_name='caiyuntranslator',
+            name='rpm',
+            field=models.IntegerField(default=0, help_text='Shared by all workers, 0 means no limit', verbose_name='Requests per Minute'),
+        ),
+        migrations.AddField(
+            model_name='caiyuntranslator',
+            name='tpm',
+            field=models.IntegerField(default=0, help_text='Shared by all workers, 0 means no limit', verbose_name='Tokens per Minute'),
+        ),
+        migrations.AddField(
+            model_name='claudetranslator',
+            name='rpm',
+            field=models.IntegerField(default=0, help_text='Shared by all workers, 0 means no limit', verbose_name='Requests per Minute'),
+        ),
+        migrations.AddField(
+            model_name='claudetranslator',
+            name='tpm',
+            field=models.IntegerField(default=0, help_text='Shared by all workers, 0 means no limit', verbose_name='Tokens per Minute'),
+        ),
+        migrations.AddField(
+            model_name='deepltranslator',
+            name='rpm',
+            field=models.IntegerField(default=0, help_text='Shared by all workers, 0 means no limit', verbose_name='Requests per Minute'),
+        ),
+        migrations.AddField(
+            model_name='deepltranslator',
+            name='tpm',
+            field=models.IntegerField(default=0, help_text='Shared by all workers, 0 means no limit', verbose_name='Tokens per Minute'),
+        ),
+        migrations.AddField(
+            model_name='deeplwebtranslator',
+            name='rpm',
+            field=models.IntegerField(default=0, help_text='Shared by all workers, 0 means no limit', verbose_name='Requests per Minute'),
+        ),
+        migrations.AddField(
+            model_name='deeplwebtranslator',
+            name='tpm',
+            field=models.IntegerField(default=0, help_text='Shared by all workers, 0 means no limit', verbose_name='Tokens per Minute'),
+        ),
+        migrations.AddField(
+            model_name='deeplxtranslator',
+            name='rpm',
+            field=models.IntegerField(default=0, help_text='Shared by all workers, 0 means no limit', verbose_name='Requests per Minute'),
+        ),
+        migrations.AddField(
+            model_name='deeplxtranslator',
+            name='tpm',
+            field=models.IntegerField(default=0, help_text='Shared by all workers, 0 means no limit', verbose_name='Tokens per Minute'),
+        ),
+        migrations.AddField(
+            model_name='doubaotranslator',
+            name='rpm',
+            field=models.IntegerField(default=0, help_text='Shared by all workers, 0 means no limit', verbose_name='Requests per Minute'),
+        ),
+        migrations.AddField(
+            model_name='doubaotranslator',
+            name='tpm',
+            field=models.IntegerField(default=0, help_text='Shared by all workers, 0 means no limit', verbose_name='Tokens per Minute'),
+        ),
+        migrations.AddField(
+            model_name='freetranslators',
+            name='rpm',
+            field=models.IntegerField(default=0, help_text='Shared by all workers, 0 means no limit', verbose_name='Requests per Minute'),
+        ),
+        migrations.AddField(
+            model_name='freetranslators',
+            name='tpm',
+            field=models.IntegerField(default=0, help_text='Shared by all workers, 0 means no limit', verbose_name='Tokens per Minute'),
+        ),
+        migrations.AddField(
+            model_name='geminitranslator',
+            name='rpm',
+            field=models.IntegerField(default=0, help_text='Shared by all workers, 0 means no limit', verbose_name='Requests per Minute'),
+        ),
+        migrations.AddField(
+            model_name='geminitranslator',
+            name='tpm',
+            field=models.IntegerField(default=0, help_text='Shared by all workers, 0 means no limit', verbose_name='Tokens per Minute'),
+        ),
+        migrations.AddField(
+            model_name='googletranslatewebtranslator',
+            name='rpm',
+            field=models.IntegerField(default=0, help_text='Shared by all workers, 0 means no limit', verbose_name='Requests per Minute'),
+        ),
+        migrations.AddField(
+            model_name='googletranslatewebtranslator',
+            name='tpm',
+            field=models.IntegerField(default=0, help_text='Shared by all workers, 0 means no limit', verbose_name='Tokens per Minute'),
+        ),
+        migrations.AddField(
+            model_name='groqtranslator',
+            name='rpm',
+            field=models.IntegerField(default=0, help_text='Shared by all workers, 0 means no limit', verbose_name='Requests per Minute'),
+        ),
+        migrations.AddField(
+            model_name='groqtranslator',
+            name='tpm',
+            field=models.IntegerField(default=0, help_text='Shared by all workers, 0 means no limit', verbose_name='Tokens per Minute'),
+        ),
+        migrations.AddField(
+            model_name='kagitranslator',
+            name='rpm',
+            field=models.IntegerField(default=0, help_text='Shared by all workers, 0 means no limit', verbose_name='Requests per Minute'),
+        ),
+        migrations.AddField(
+            model_name='kagitranslator',
+            name='tpm',
+            field=models.IntegerField(default=0, help_text='Shared by all workers, 0 means no limit', verbose_name='Tokens per Minute'),
+        ),
+        migrations.AddField(
+            model_name='microsofttranslator',
+            name='rpm',
+            field=models.IntegerField(default=0, help_text='Shared by all workers, 0 means no limit', verbose_name='Requests per Minute'),
+        ),
+        migrations.AddField(
+            model_name='microsofttranslator',
+            name='tpm',
+            field=models.IntegerField(default=0, help_text='Shared by all workers, 0 means no limit', verbose_name='Tokens per Minute'),
+        ),
+        migrations.AddField(
+            model_name='moonshotaitranslator',
+            name='rpm',
+            field=models.IntegerField(default=0, help_text='Shared by all workers, 0 means no limit', verbose_name='Requests per Minute'),
+        ),
+        migrations.AddField(
+            model_name='moonshotaitranslator',
+            name='tpm',
+            field=models.IntegerField(default=0, help_text='Shared by all workers, 0 means no limit', verbose_name='Tokens per Minute'),
+        ),
+        migrations.AddField(
+            model_name='openaitranslator',
+            name='rpm',
+            field=models.IntegerField(default=0, help_text='Shared by all workers, 0 means no limit', verbose_name='Requests per Minute'),
+        ),
+        migrations.AddField(
+            model_name='openaitranslator',
+            name='tpm',
+            field=models.IntegerField(default=0, help_text='Shared by all workers, 0 means no limit', verbose_name='Tokens per Minute'),
+        ),
+        migrations.AddField(
+            model_name='openltranslator',
+            name='rpm',
+            field=models.IntegerField(default=0, help_text='Shared by all workers, 0 means no limit', verbose_name='Requests per Minute'),
+        ),
+        migrations.AddField(
+            model_name='openltranslator',
+            name='tpm',
+            field=models.IntegerField(default=0, help_text='Shared by all workers, 0 means no limit', verbose_name='Tokens per Minute'),
+        ),
+        migrations.AddField(
+            model_name='openrouteraitranslator',
+            name='rpm',
+            field=models.IntegerField(default=0, help_text='Shared by all workers, 0 means no limit', verbose_name='Requests per Minute'),
+        ),
+        migrations.AddField(
+            model_name='openrouteraitranslator',
+            name='tpm',
+            field=models.IntegerField(default=0, help_text='Shared by all workers, 0 means no limit', verbose_name='Tokens per Minute'),
+        ),
+        migrations.AddField(
+            model_name='testtranslator',
+            name='rpm',
+            field=models.IntegerField(default=0, help_text='Shared by all workers, 0 means no limit', verbose_name='Requests per Minute'),
+        ),
+        migrations.AddField(
+            model_name='testtranslator',
+            name='tpm',
+            field=models.IntegerField(default=0, help_text='Shared by all workers, 0 means no limit', verbose_name='Tokens per Minute'),
+        ),
+        migrations.AddField(
+            model_name='togetheraitranslator',
+            name='rpm',
+            field=models.IntegerField(default=0, help_text='Shared by all workers, 0 means no limit', verbose_name='Requests per Minute'),
+        ),
+        migrations.AddField(
+            model_name='togetheraitranslator',
+            name='tpm',
+            field=models.IntegerField(default=0, help_text='Shared by all workers, 0 means no limit', verbose_name='Tokens per Minute'),
+        ),
+    ]
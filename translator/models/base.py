@@ -5,18 +5,74 @@ import cityhash
 from config import settings
 from openai import OpenAI
 from encrypted_model_fields.fields import EncryptedCharField
+from translator.cache import translation_cache
+from translator.throttle import rate_limiter
+from translator.clients import client_registry
 
 
 class TranslatorEngine(models.Model):
     name = models.CharField(_("Name"), max_length=100, unique=True)
     valid = models.BooleanField(_("Valid"), null=True)
     is_ai = models.BooleanField(default=False, editable=False)
+    max_concurrency = models.IntegerField(
+        _("Max Concurrency"),
+        default=1,
+        help_text=_("Max number of parallel requests sent to this engine"),
+    )
+    rpm = models.IntegerField(
+        _("Requests per Minute"),
+        default=0,
+        help_text=_("Shared by all workers, 0 means no limit"),
+    )
+    tpm = models.IntegerField(
+        _("Tokens per Minute"),
+        default=0,
+        help_text=_("Shared by all workers, 0 means no limit"),
+    )
+    # max number of texts per native translate_many() request, 0 if the engine has no batch endpoint
+    batch_size = 0
 
     def translate(self, text: str, target_language: str, source_language:str="auto", **kwargs) -> dict:
         raise NotImplementedError(
             "subclasses of TranslatorEngine must provide a translate() method"
         )
 
+    def translate_many(self, texts: list, target_language: str, **kwargs) -> dict:
+        """
+        Translate several texts, return {"texts": [...], "tokens": int, "characters": int}
+        with the translations in the same order. Falls back to one translate() per text,
+        engines with a native batch endpoint override it and set batch_size.
+        """
+        results = [self.translate(text, target_language, **kwargs) for text in texts]
+        return {
+            "texts": [result.get("text", "") for result in results],
+            "tokens": sum(result.get("tokens", 0) for result in results),
+            "characters": sum(len(text) for text in texts),
+        }
+
+    def throttle(self, text: str = ""):
+        """
+        Wait for a permit of the shared rate limiter before sending a request.
+        Engines with a request interval get one request per interval.
+        Tokens are charged with a rough estimate (input + output) of the text.
+        """
+        key = f"{self.__class__.__name__}:{self.pk}"
+        interval = getattr(self, "interval", 0) or 0
+        if self.rpm:
+            rate_limiter.acquire(f"{key}:requests", 1, self.rpm)
+        elif interval > 0:
+            rate_limiter.acquire(f"{key}:requests", 1, 60 / interval, capacity=1)
+        if self.tpm and text:
+            rate_limiter.acquire(f"{key}:tokens", len(text) // 2 or 1, self.tpm, capacity=self.tpm)
+
+    def _init(self):
+        """Build the SDK client of the engine, engines without one return None."""
+        return None
+
+    def client(self):
+        """Return the pooled SDK client, rebuilt when the engine config changes."""
+        return client_registry.get(self, self._init)
+
     def min_size(self) -> int:
         if hasattr(self, "max_characters"):
             return self.max_characters * 0.7
@@ -39,6 +95,14 @@ class TranslatorEngine(models.Model):
     class Meta:
         abstract = True
 
+    def save(self, *args, **kwargs):
+        super().save(*args, **kwargs)
+        client_registry.invalidate(self)
+
+    def delete(self, *args, **kwargs):
+        client_registry.invalidate(self)
+        return super().delete(*args, **kwargs)
+
     def __str__(self):
         return self.name
 
@@ -57,28 +121,66 @@ class Translated_Content(models.Model):
     def __str__(self):
         return self.original_content
 
+    @staticmethod
+    def make_hash(text, target_language) -> str:
+        return str(cityhash.CityHash128(f"{text}{target_language}"))
+
     @classmethod
     def is_translated(cls, text, target_language):
-        text_hash = str(cityhash.CityHash128(f"{text}{target_language}"))
+        text_hash = cls.make_hash(text, target_language)
+        cached = translation_cache.get(text_hash)
+        if cached is not None:
+            return cached
         try:
             content = Translated_Content.objects.get(hash=text_hash)
             # logging.info("Using cached translations:%s", text)
-            return {
+            cached = {
                 "text": content.translated_content,
                 "tokens": content.tokens,
                 "characters": content.characters,
             }
+            translation_cache.set(text_hash, cached)
+            return cached
         except Translated_Content.DoesNotExist:
             logging.info("Does not exist in cache:%s", text)
             return None
 
+    @classmethod
+    def lookup_many(cls, texts, target_language, chunk_size: int = 500) -> dict:
+        """
+        Resolve many texts with chunked `IN` queries instead of one query per text.
+        Returns {text: {"text", "tokens", "characters"}} for the cached ones only.
+        """
+        hashes = {cls.make_hash(text, target_language): text for text in set(texts) if text}
+        found = {
+            hashes[key]: value
+            for key, value in translation_cache.get_many(hashes).items()
+        }
+        keys = [key for key in hashes if hashes[key] not in found]
+        for i in range(0, len(keys), chunk_size):
+            for content in cls.objects.filter(hash__in=keys[i : i + chunk_size]).only(
+                "hash", "translated_content", "tokens", "characters"
+            ):
+                cached = {
+                    "text": content.translated_content,
+                    "tokens": content.tokens,
+                    "characters": content.characters,
+                }
+                translation_cache.set(content.hash, cached)
+                found[hashes[content.hash]] = cached
+        logging.info("Cache lookup: %d/%d hits", len(found), len(hashes))
+        return found
+
+    def to_cache(self) -> dict:
+        return {
+            "text": self.translated_content,
+            "tokens": self.tokens,
+            "characters": self.characters,
+        }
+
     def save(self, *args, **kwargs):
         if not self.hash:
-            self.hash = str(
-                cityhash.CityHash128(
-                    f"{self.original_content}{self.translated_language}"
-                )
-            )
+            self.hash = self.make_hash(self.original_content, self.translated_language)
 
         super(Translated_Content, self).save(*args, **kwargs)
 
@@ -120,7 +222,7 @@ class OpenAIInterface(TranslatorEngine):
     def validate(self) -> bool:
         if self.api_key:
             try:
-                client = self._init()
+                client = self.client()
                 res = client.with_options(max_retries=3).chat.completions.create(
                     model=self.model,
                     messages=[{"role": "user", "content": "Hi"}],
@@ -145,7 +247,7 @@ class OpenAIInterface(TranslatorEngine):
         **kwargs
     ) -> dict:
         logging.info(">>> Translate [%s]: %s", target_language, text)
-        client = self._init()
+        client = self.client()
         tokens = 0
         translated_text = ""
         system_prompt = (
@@ -58,7 +58,7 @@ class ClaudeTranslator(TranslatorEngine):
         **kwargs
     ) -> dict:
         logging.info(">>> Claude Translate [%s]:", target_language)
-        client = self._init()
+        client = self.client()
         tokens = client.count_tokens(text)
         translated_text = ""
         system_prompt = (
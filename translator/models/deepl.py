@@ -34,6 +34,8 @@ class DeepLTranslator(TranslatorEngine):
         "Turkish": "TR",
     }
 
+    batch_size = 50  # texts per request accepted by the API
+
     class Meta:
         verbose_name = "DeepL"
         verbose_name_plural = "DeepL"
@@ -45,7 +47,7 @@ class DeepLTranslator(TranslatorEngine):
 
     def validate(self) -> bool:
         try:
-            translator = self._init()
+            translator = self.client()
             usage = translator.get_usage()
             return usage.character.valid
         except Exception as e:
@@ -61,7 +63,7 @@ class DeepLTranslator(TranslatorEngine):
                 logging.error(
                     "DeepLTranslator->Not support target language:%s", target_language
                 )
-            translator = self._init()
+            translator = self.client()
             resp = translator.translate_text(
                 text,
                 target_lang=target_code,
@@ -72,3 +74,27 @@ class DeepLTranslator(TranslatorEngine):
         except Exception as e:
             logging.error("DeepLTranslator->%s: %s", e, text)
         return {"text": translated_text, "characters": len(text)}
+
+    def translate_many(self, texts: list, target_language: str, **kwargs) -> dict:
+        logging.info(">>> DeepL Translate [%s]: %d texts", target_language, len(texts))
+        target_code = self.language_code_map.get(target_language, None)
+        translated_texts = [""] * len(texts)
+        try:
+            if target_code is None:
+                logging.error(
+                    "DeepLTranslator->Not support target language:%s", target_language
+                )
+            translator = self.client()
+            resp = translator.translate_text(
+                texts,
+                target_lang=target_code,
+                preserve_formatting=True,
+                split_sentences="nonewlines",
+            )
+            translated_texts = [result.text for result in resp]
+        except Exception as e:
+            logging.error("DeepLTranslator->%s: %s", e, texts)
+        return {
+            "texts": translated_texts,
+            "characters": sum(len(text) for text in texts),
+        }
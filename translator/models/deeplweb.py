@@ -1,7 +1,6 @@
 from PyDeepLX import PyDeepLX
 from .base import TranslatorEngine
 import logging
-from time import sleep
 from django.db import models
 from django.utils.translation import gettext_lazy as _
 
@@ -62,6 +61,4 @@ class DeepLWebTranslator(TranslatorEngine):
         except Exception as e:
             logging.error("DeepLWebTranslator->%s: %s", e, text)
         finally:
-            if not validate:
-                sleep(self.interval)
             return {"text": translated_text, "characters": len(text)}
@@ -2,7 +2,6 @@ import json
 import httpx
 from .base import TranslatorEngine
 import logging
-from time import sleep
 from django.db import models
 from django.utils.translation import gettext_lazy as _
 
@@ -73,6 +72,4 @@ class DeepLXTranslator(TranslatorEngine):
         except Exception as e:
             logging.error("DeepLXTranslator->%s: %s", e, text)
         finally:
-            if not validate:
-                sleep(self.interval)
             return {"text": translated_text, "characters": len(text)}
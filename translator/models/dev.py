@@ -1,7 +1,6 @@
 from .base import TranslatorEngine
 import logging
 from django.db import models
-from time import sleep
 from django.utils.translation import gettext_lazy as _
 
 
@@ -20,7 +19,6 @@ class TestTranslator(TranslatorEngine):
 
     def translate(self, text: str, target_language: str, **kwargs) -> dict:
         logging.info(">>> Test Translate [%s]: %s", target_language, text)
-        sleep(self.interval)
         return {"text": self.translated_text, "tokens": 0, "characters": len(text)}
 
     def summarize(self, text: str, target_language: str) -> dict:
@@ -30,7 +30,7 @@ class DoubaoTranslator(TranslatorEngine):
 
     def validate(self) -> bool:
         try:
-            client = self._init()
+            client = self.client()
             completion = client.chat.completions.create(
                 model=self.endpoint_id,
                 messages=[
@@ -47,7 +47,7 @@ class DoubaoTranslator(TranslatorEngine):
         text_type: str = "title", **kwargs) -> dict:
 
         logging.info(">>> Doubao Translate [%s]: %s", target_language, text)
-        client = self._init()
+        client = self.client()
         translated_text = ""
         tokens = 0
         system_prompt = (
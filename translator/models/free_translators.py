@@ -2,7 +2,7 @@ from .base import TranslatorEngine
 import logging
 from django.db import models
 from django.utils.translation import gettext_lazy as _
-from langdetect import detect
+from utils.language_detector import language_detector
 
 class FreeTranslators(TranslatorEngine):
     translators = models.TextField(null=True, blank=True, default="")  # list[dict]
@@ -15,6 +15,8 @@ class FreeTranslators(TranslatorEngine):
     )
     max_characters = models.IntegerField(default=5000)
 
+    batch_size = 50
+
     class Meta:
         verbose_name = "Free Translators"
         verbose_name_plural = "Free Translators"
@@ -29,9 +31,10 @@ class FreeTranslators(TranslatorEngine):
         return True
 
     def translate(self, text: str, target_language: str, source_language:str="auto", **kwargs) -> dict:
-        et = self._init()
+        et = self.client()
         try:
-            source_language = detect(text) if source_language == "auto" else source_language
+            if source_language == "auto":
+                source_language = language_detector.detect_text(text)[0]
         except:
             source_language = "auto"
             logging.warning("Cannot detect source language:%s", text)
@@ -45,8 +48,21 @@ class FreeTranslators(TranslatorEngine):
         )
         return {"text": translated_text, "characters": len(text)}
 
+    def translate_many(self, texts: list, target_language: str, **kwargs) -> dict:
+        results = self.translate_batch(texts, target_language)
+        translated_texts = []
+        for text in texts:
+            result = results.get(text) or {}
+            translated_texts.append(
+                result.get("translated_text", "") if result.get("status") == "success" else ""
+            )
+        return {
+            "texts": translated_texts,
+            "characters": sum(len(text) for text in texts),
+        }
+
     def translate_batch(self, text_list: list, target_language: str, **kwargs) -> dict:
-        et = self._init()
+        et = self.client()
         results = et.translate_batch(
             text_list=text_list, dest_lang=target_language, proxies=self.proxies
         )
@@ -1,9 +1,8 @@
 from config import settings
-import google.generativeai as genai
+import google.ai.generativelanguage as glm
 from google.generativeai.types import HarmCategory, HarmBlockThreshold
 from .base import TranslatorEngine
 import logging
-from time import sleep
 from django.db import models
 from encrypted_model_fields.fields import EncryptedCharField
 from django.utils.translation import gettext_lazy as _
@@ -39,17 +38,23 @@ class GeminiTranslator(TranslatorEngine):
         verbose_name_plural = "Google Gemini"
 
     def _init(self, system_prompt: str = None):
-        genai.configure(api_key=self.api_key)
-        return genai.GenerativeModel(
-            model_name=self.model,
-            # system_instruction=system_prompt or self.translate_prompt
-        )
+        # genai.configure() is global, a pooled client carries its own api key instead
+        return glm.GenerativeServiceClient(client_options={"api_key": self.api_key})
+
+    @property
+    def model_name(self) -> str:
+        return self.model if self.model.startswith("models/") else f"models/{self.model}"
+
+    def _contents(self, prompt: str) -> list:
+        return [glm.Content(role="user", parts=[glm.Part(text=prompt)])]
 
     def validate(self) -> bool:
         if self.api_key:
             try:
-                model = self._init()
-                res = model.generate_content("hi")
+                client = self.client()
+                res = client.generate_content(
+                    model=self.model_name, contents=self._contents("hi")
+                )
                 return res.candidates[0].finish_reason == 1
             except Exception as e:
                 logging.error("GeminiTranslator validate ->%s", e)
@@ -73,36 +78,52 @@ class GeminiTranslator(TranslatorEngine):
             if text_type == "title"
             else self.content_translate_prompt
         )
-        prompt = f"{system_prompt.replace('{target_language}', target_language)}\n{user_prompt}\n{text}"
+        system_prompt = system_prompt.replace("{target_language}", target_language)
+        if user_prompt:
+            system_prompt += f"\n\n{user_prompt}"
+        prompt = f"{system_prompt}\n{text}"
         try:
-            model = self._init()
-            generation_config = genai.types.GenerationConfig(
+            client = self.client()
+            generation_config = glm.GenerationConfig(
                 candidate_count=1,
                 temperature=self.temperature,
                 top_p=self.top_p,
                 top_k=self.top_k,
                 max_output_tokens=self.max_tokens,
             )
-            safety_settings = {
-                HarmCategory.HARM_CATEGORY_HATE_SPEECH: HarmBlockThreshold.BLOCK_NONE,
-                HarmCategory.HARM_CATEGORY_HARASSMENT: HarmBlockThreshold.BLOCK_NONE,
-                HarmCategory.HARM_CATEGORY_DANGEROUS_CONTENT: HarmBlockThreshold.BLOCK_NONE,
-                HarmCategory.HARM_CATEGORY_SEXUALLY_EXPLICIT: HarmBlockThreshold.BLOCK_NONE,
-            }
-            res = model.generate_content(prompt, generation_config=generation_config, safety_settings=safety_settings)
+            safety_settings = [
+                glm.SafetySetting(category=category, threshold=HarmBlockThreshold.BLOCK_NONE)
+                for category in (
+                    HarmCategory.HARM_CATEGORY_HATE_SPEECH,
+                    HarmCategory.HARM_CATEGORY_HARASSMENT,
+                    HarmCategory.HARM_CATEGORY_DANGEROUS_CONTENT,
+                    HarmCategory.HARM_CATEGORY_SEXUALLY_EXPLICIT,
+                )
+            ]
+            contents = self._contents(prompt)
+            res = client.generate_content(
+                glm.GenerateContentRequest(
+                    model=self.model_name,
+                    contents=contents,
+                    generation_config=generation_config,
+                    safety_settings=safety_settings,
+                )
+            )
             finish_reason = res.candidates[0].finish_reason if res.candidates else None
             if finish_reason == 1:
-                translated_text = res.text
+                translated_text = "".join(
+                    part.text for part in res.candidates[0].content.parts
+                )
             else:
                 translated_text = ""
                 logging.info(
                     "GeminiTranslator finish_reason->%s: %s", finish_reason.name, text
                 )
-            tokens = model.count_tokens(prompt).total_tokens
+            tokens = client.count_tokens(
+                model=self.model_name, contents=contents
+            ).total_tokens
         except Exception as e:
             logging.error("GeminiTranslator->%s: %s", e, text)
-        finally:
-            sleep(self.interval)
 
         return {"text": translated_text, "tokens": tokens}
 
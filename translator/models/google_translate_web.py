@@ -1,4 +1,3 @@
-from time import sleep
 from .base import TranslatorEngine
 import logging
 from django.db import models
@@ -74,6 +73,4 @@ class GoogleTranslateWebTranslator(TranslatorEngine):
         except Exception as e:
             logging.error("GoogleTranslateWebTranslator->%s: %s", e, text)
         finally:
-            if not validate:
-                sleep(self.interval)
             return {"text": translated_text, "characters": len(text)}
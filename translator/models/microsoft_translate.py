@@ -38,6 +38,8 @@ class MicrosoftTranslator(TranslatorEngine):
         "Turkish": "tr",
     }
 
+    batch_size = 100  # array elements per request accepted by the API
+
     class Meta:
         verbose_name = "Microsoft Translator"
         verbose_name_plural = "Microsoft Translator"
@@ -48,8 +50,12 @@ class MicrosoftTranslator(TranslatorEngine):
 
     def translate(self, text: str, target_language: str, **kwargs) -> dict:
         logging.info(">>> Microsoft Translate [%s]: %s", target_language, text)
+        results = self.translate_many([text], target_language)
+        return {"text": results["texts"][0], "characters": len(text)}
+
+    def translate_many(self, texts: list, target_language: str, **kwargs) -> dict:
         target_code = self.language_code_map.get(target_language, None)
-        translated_text = ""
+        translated_texts = [""] * len(texts)
         try:
             if target_code is None:
                 logging.error(
@@ -65,7 +71,7 @@ class MicrosoftTranslator(TranslatorEngine):
                 "Content-type": "application/json",
                 "X-ClientTraceId": str(uuid.uuid4()),
             }
-            body = [{"text": text}]
+            body = [{"text": text} for text in texts]
 
             with httpx.Client() as client:
                 resp = client.post(
@@ -76,9 +82,14 @@ class MicrosoftTranslator(TranslatorEngine):
                     timeout=10,
                 )
                 resp.raise_for_status()
-                translated_text = resp.json()[0]["translations"][0]["text"]
+                translated_texts = [
+                    item["translations"][0]["text"] for item in resp.json()
+                ]
             # [{'detectedLanguage': {'language': 'en', 'score': 1.0}, 'translations': [{'text': '你好，我叫约翰。', 'to': 'zh-Hans'}]}]
         except Exception as e:
-            logging.error("MicrosoftTranslator->%s: %s", e, text)
+            logging.error("MicrosoftTranslator->%s: %s", e, texts)
         finally:
-            return {"text": translated_text, "characters": len(text)}
+            return {
+                "texts": translated_texts,
+                "characters": sum(len(text) for text in texts),
+            }
@@ -0,0 +1,96 @@
+import logging
+import threading
+from typing import Callable, Optional, Tuple
+
+from translator.cache import translation_cache
+
+
+class Flight:
+    __slots__ = ("event", "result")
+
+    def __init__(self):
+        self.event = threading.Event()
+        self.result = None
+
+
+class SingleFlight:
+    """
+    Collapse identical in-flight translation requests into one engine call.
+
+    Keys are the Translated_Content hashes of (text, target language). The
+    first caller of a key becomes the leader and calls the engine, later
+    callers of the same key wait for it and share its result instead of
+    paying for the same translation again. A shared result is also put into
+    the in-process LRU, so callers arriving after the flight landed but
+    before the row is written to the db still hit the cache. If the leader
+    fails or times out, the waiters translate the text themselves.
+    """
+
+    def __init__(self, timeout: float = 300):
+        self.timeout = timeout
+        self.leaders = 0
+        self.shared = 0
+        self.timeouts = 0
+        self._flights = {}
+        self._lock = threading.Lock()
+
+    def claim(self, key: str) -> Tuple[bool, Flight]:
+        """Return (True, flight) if the caller must translate the key, (False, flight) to wait for it."""
+        with self._lock:
+            flight = self._flights.get(key)
+            if flight is not None:
+                return False, flight
+            flight = Flight()
+            self._flights[key] = flight
+            self.leaders += 1
+            return True, flight
+
+    def resolve(self, key: str, flight: Flight, result: Optional[dict]):
+        """Publish the leader's result (None if it failed) and wake up the waiters."""
+        if result and result.get("text"):
+            flight.result = result
+            translation_cache.set(key, result)
+        with self._lock:
+            if self._flights.get(key) is flight:
+                del self._flights[key]
+        flight.event.set()
+
+    def wait(self, flight: Flight) -> Optional[dict]:
+        """Wait for the leader, return its result or None if there is nothing to share."""
+        if not flight.event.wait(self.timeout):
+            with self._lock:
+                self.timeouts += 1
+            logging.warning("SingleFlight: timeout while waiting for a translation")
+            return None
+        if flight.result is None:
+            return None
+        with self._lock:
+            self.shared += 1
+        return flight.result
+
+    def do(self, key: str, fn: Callable[[], dict]) -> Tuple[dict, bool]:
+        """Call fn() once per in-flight key, return (result, shared)."""
+        leader, flight = self.claim(key)
+        if not leader:
+            result = self.wait(flight)
+            if result is not None:
+                return result, True
+            return fn(), False
+        result = None
+        try:
+            result = fn()
+            return result, False
+        finally:
+            self.resolve(key, flight, result)
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "in_flight": len(self._flights),
+                "leaders": self.leaders,
+                "shared": self.shared,
+                "timeouts": self.timeouts,
+            }
+
+
+translation_flight = SingleFlight()
@@ -1,3 +1,189 @@
-from django.test import TestCase
+import os
+import tempfile
+import threading
+from types import SimpleNamespace
+from unittest import mock
 
-# Create your tests here.
+from django.test import SimpleTestCase
+
+from . import throttle
+from .cache import TranslationCache, translation_cache
+from .singleflight import SingleFlight
+
+
+class SingleFlightTests(SimpleTestCase):
+    def setUp(self):
+        translation_cache.clear()
+        self.addCleanup(translation_cache.clear)
+        self.flight = SingleFlight(timeout=5)
+
+    def run_follower(self, key, fn):
+        """Call do(key, fn) in a thread, return once it has claimed the key"""
+        results = []
+        claimed = threading.Event()
+        claim = self.flight.claim
+
+        def claim_and_signal(claim_key):
+            try:
+                return claim(claim_key)
+            finally:
+                claimed.set()
+
+        self.flight.claim = claim_and_signal
+        follower = threading.Thread(target=lambda: results.append(self.flight.do(key, fn)))
+        follower.start()
+        claimed.wait(5)
+        self.flight.claim = claim
+        return follower, results
+
+    def test_waiters_share_the_leader_result(self):
+        leader, flight = self.flight.claim("k")
+        self.assertTrue(leader)
+        follower, results = self.run_follower("k", lambda: self.fail("must share"))
+        self.flight.resolve("k", flight, {"text": "hola", "tokens": 3})
+        follower.join()
+        self.assertEqual(results, [({"text": "hola", "tokens": 3}, True)])
+        self.assertEqual(translation_cache.get("k")["text"], "hola")
+        self.assertEqual(self.flight.stats()["in_flight"], 0)
+
+    def test_leader_error_propagates_and_waiters_translate_themselves(self):
+        leader_started, release_leader = threading.Event(), threading.Event()
+
+        def failing():
+            leader_started.set()
+            release_leader.wait(5)
+            raise RuntimeError("engine down")
+
+        errors = []
+
+        def lead():
+            try:
+                self.flight.do("k", failing)
+            except RuntimeError as e:
+                errors.append(e)
+
+        leader = threading.Thread(target=lead)
+        leader.start()
+        leader_started.wait(5)
+        follower, results = self.run_follower("k", lambda: {"text": "own", "tokens": 1})
+        release_leader.set()
+        leader.join()
+        follower.join()
+        self.assertEqual([str(e) for e in errors], ["engine down"])
+        self.assertEqual(results, [({"text": "own", "tokens": 1}, False)])
+        self.assertIsNone(translation_cache.get("k"))
+        self.assertEqual(self.flight.stats()["in_flight"], 0)
+
+    def test_empty_result_is_not_shared(self):
+        leader, flight = self.flight.claim("k")
+        follower, results = self.run_follower("k", lambda: {"text": "own", "tokens": 1})
+        self.flight.resolve("k", flight, {"text": "", "tokens": 1})
+        follower.join()
+        self.assertEqual(results, [({"text": "own", "tokens": 1}, False)])
+
+    def test_wait_timeout(self):
+        flight = SingleFlight(timeout=0.01)
+        flight.claim("k")
+        with self.assertLogs(level="WARNING"):
+            self.assertEqual(flight.do("k", lambda: {"text": "own"}), ({"text": "own"}, False))
+        self.assertEqual(flight.stats()["timeouts"], 1)
+
+
+class RateLimiterTests(SimpleTestCase):
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.limiter = throttle.RateLimiter(os.path.join(tmp.name, "ratelimit.sqlite3"))
+        self.now = 1000.0
+        self.sleeps = []
+
+        def sleep(seconds):
+            self.sleeps.append(seconds)
+            self.now += seconds
+
+        patcher = mock.patch.multiple(throttle.time, time=lambda: self.now, sleep=sleep)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_burst_then_refill(self):
+        for _ in range(3):
+            self.limiter.acquire("k", 1, 60, capacity=3)
+        self.assertEqual(self.sleeps, [])
+        self.limiter.acquire("k", 1, 60, capacity=3)
+        self.assertEqual(self.sleeps, [1.0])
+        self.now += 2
+        self.limiter.acquire("k", 2, 60, capacity=3)
+        self.assertEqual(self.sleeps, [1.0])
+
+    def test_buckets_are_separate(self):
+        self.limiter.acquire("a", 1, 6, capacity=1)
+        self.limiter.acquire("b", 1, 6, capacity=1)
+        self.assertEqual(self.sleeps, [])
+        self.limiter.acquire("a", 1, 6, capacity=1)
+        self.assertEqual(self.sleeps, [10.0])
+
+    def test_large_request_is_capped_to_capacity(self):
+        self.limiter.acquire("k", 1000, 60, capacity=10)
+        self.limiter.acquire("k", 1000, 60, capacity=10)
+        self.assertEqual(self.sleeps, [10.0])
+
+    def test_unlimited(self):
+        self.limiter.acquire("k", 1, 0)
+        self.limiter.acquire("k", 0, 60)
+        self.assertEqual(self.sleeps, [])
+
+
+class EngineSlotTests(SimpleTestCase):
+    def test_slot_is_shared_and_follows_max_concurrency(self):
+        engine = SimpleNamespace(pk=1, max_concurrency=2)
+        slot = throttle.engine_slot(engine)
+        self.assertIs(throttle.engine_slot(SimpleNamespace(pk=1, max_concurrency=2)), slot)
+        self.assertTrue(slot.acquire(blocking=False))
+        self.assertTrue(slot.acquire(blocking=False))
+        self.assertFalse(slot.acquire(blocking=False))
+        slot.release()
+        slot.release()
+        engine.max_concurrency = 1
+        self.assertIsNot(throttle.engine_slot(engine), slot)
+        self.assertIsNot(throttle.engine_slot(SimpleNamespace(pk=2, max_concurrency=0)), slot)
+
+
+class TranslationCacheTests(SimpleTestCase):
+    def value(self, text):
+        return {"text": text, "tokens": 0, "characters": len(text)}
+
+    def test_get_many_counts_hits_and_misses(self):
+        cache = TranslationCache(max_bytes=1 << 20)
+        cache.set("a", self.value("A"))
+        cache.set("b", self.value("B"))
+        self.assertEqual(cache.get_many(["a", "b", "c"]), {"a": self.value("A"), "b": self.value("B")})
+        self.assertIsNone(cache.get("c"))
+        stats = cache.stats()
+        self.assertEqual((stats["hits"], stats["misses"]), (2, 2))
+
+    def test_evicts_least_recently_used(self):
+        item_size = TranslationCache._sizeof("a", self.value("A"))
+        cache = TranslationCache(max_bytes=item_size * 2)
+        cache.set("a", self.value("A"))
+        cache.set("b", self.value("B"))
+        cache.get("a")
+        cache.set("c", self.value("C"))
+        self.assertIsNone(cache.get("b"))
+        self.assertIsNotNone(cache.get("a"))
+        self.assertIsNotNone(cache.get("c"))
+        self.assertEqual(cache.stats()["evictions"], 1)
+        self.assertLessEqual(cache.stats()["size"], cache.max_bytes)
+
+    def test_replacing_a_key_keeps_size_accurate(self):
+        cache = TranslationCache(max_bytes=1 << 20)
+        cache.set("a", self.value("short"))
+        cache.set("a", self.value("a much longer translation"))
+        self.assertEqual(cache.size, TranslationCache._sizeof("a", self.value("a much longer translation")))
+
+    def test_oversized_or_disabled(self):
+        cache = TranslationCache(max_bytes=200)
+        cache.set("a", self.value("x" * 1000))
+        self.assertIsNone(cache.get("a"))
+        disabled = TranslationCache(max_bytes=0)
+        disabled.set("a", self.value("A"))
+        self.assertIsNone(disabled.get("a"))
@@ -0,0 +1,107 @@
+import logging
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+
+from django.conf import settings
+
+_lock = threading.Lock()
+_slots = {}
+
+
+def engine_slot(engine) -> threading.BoundedSemaphore:
+    """
+    Semaphore bounding the in-flight requests of one engine instance to its
+    max_concurrency, shared by every entry and segment worker of the process.
+    Use it as a context manager around each engine call.
+    """
+    key = (engine.__class__.__name__, engine.pk)
+    limit = max(getattr(engine, "max_concurrency", 1) or 1, 1)
+    with _lock:
+        slot = _slots.get(key)
+        if slot is None or slot[0] != limit:
+            slot = (limit, threading.BoundedSemaphore(limit))
+            _slots[key] = slot
+        return slot[1]
+
+
+@contextmanager
+def engine_call(engine, text: str = ""):
+    """Hold a concurrency slot and a rate limit permit of the engine for one request."""
+    with engine_slot(engine):
+        engine.throttle(text)
+        yield
+
+
+class RateLimiter:
+    """
+    Token buckets shared by every worker and consumer process.
+
+    The buckets live in a small SQLite file next to the other data files,
+    each acquire() is one short IMMEDIATE transaction, so concurrent
+    processes never hand out the same permit twice.
+    """
+
+    def __init__(self, path):
+        self.path = str(path)
+        self._local = threading.local()
+        self._ready = False
+
+    def _connection(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+            if not self._ready:
+                conn.execute(
+                    "CREATE TABLE IF NOT EXISTS bucket "
+                    "(key TEXT PRIMARY KEY, tokens REAL NOT NULL, updated REAL NOT NULL)"
+                )
+                self._ready = True
+            self._local.conn = conn
+        return conn
+
+    def _take(self, key: str, amount: float, capacity: float, rate: float) -> float:
+        """Take amount from the bucket if possible, return the seconds to wait otherwise."""
+        conn = self._connection()
+        now = time.time()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            row = conn.execute(
+                "SELECT tokens, updated FROM bucket WHERE key = ?", (key,)
+            ).fetchone()
+            tokens = capacity if row is None else min(capacity, row[0] + (now - row[1]) * rate)
+            wait = 0.0
+            if tokens >= amount:
+                tokens -= amount
+            else:
+                wait = (amount - tokens) / rate
+            conn.execute(
+                "INSERT OR REPLACE INTO bucket (key, tokens, updated) VALUES (?, ?, ?)",
+                (key, tokens, now),
+            )
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+        return wait
+
+    def acquire(self, key: str, amount: float, per_minute: float, capacity: float = 0):
+        """Block until amount permits are available in a bucket refilled at per_minute."""
+        if per_minute <= 0 or amount <= 0:
+            return
+        rate = per_minute / 60
+        capacity = capacity or max(rate, 1)
+        amount = min(amount, capacity)  # a single large request must not wait forever
+        while True:
+            try:
+                wait = self._take(key, amount, capacity, rate)
+            except sqlite3.Error as e:
+                logging.warning("RateLimiter %s: %s", key, e)
+                return
+            if wait <= 0:
+                return
+            time.sleep(wait)
+
+
+rate_limiter = RateLimiter(settings.DATA_FOLDER / "ratelimit.sqlite3")
@@ -9,14 +9,16 @@ from time import mktime
 # from dateutil import parser
 from django.conf import settings
 
-from typing import Dict
+from typing import Dict, List, Tuple
 
+import cityhash
 import feedparser
 import httpx
 from lxml import etree
 
 from feedgen.feed import FeedGenerator
-from fake_useragent import UserAgent
+
+from .feed_fetcher import fetcher
 
 
 def get_first_non_none(feed, *keys):
@@ -24,65 +26,76 @@ def get_first_non_none(feed, *keys):
                 None)
 
 
-def fetch_feed(url: str, etag: str = "") -> Dict:
+def _parse_response(url: str, response, error: str = None) -> Dict:
     update = False
     feed = {}
-    error = None
-    response = None
-    ua = UserAgent()
-    headers = {
-        "If-None-Match": etag,
-        #'If-Modified-Since': modified,
-        "User-Agent": ua.random.strip(),
-        "Accept":
-        "text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,*/*;q=0.8",
-        "Accept-Language": "en-US,en;q=0.5",
-        "Accept-Encoding": "gzip, deflate, br",
-        "Connection": "keep-alive",
-        "Upgrade-Insecure-Requests": "1",
-        "Sec-Fetch-Dest": "document",
-        "Sec-Fetch-Mode": "navigate",
-        "Sec-Fetch-Site": "none",
-        "Sec-Fetch-User": "?1",
-        "Cache-Control": "max-age=0"
-    }
-
-    client = httpx.Client()
-
-    try:
-        response = client.get(url,
-                              headers=headers,
-                              timeout=30,
-                              follow_redirects=True)
-
-        if response.status_code == 200:
-            feed = feedparser.parse(response.text)
-            update = True
-        elif response.status_code == 304:
-            update = False
-        else:
-            response.raise_for_status()
 
-    except httpx.HTTPStatusError as exc:
-        error = f"HTTP status error while requesting {url}: {exc.response.status_code} {exc.response.reason_phrase}"
-    except httpx.TimeoutException:
-        error = f"Timeout while requesting {url}"
-    except Exception as e:
-        error = f"Error while requesting {url}: {str(e)}"
+    if response is not None and error is None:
+        try:
+            if response.status_code == 200:
+                feed = feedparser.parse(response.text)
+                update = True
+            elif response.status_code == 304:
+                update = False
+            else:
+                response.raise_for_status()
+        except httpx.HTTPStatusError as exc:
+            error = f"HTTP status error while requesting {url}: {exc.response.status_code} {exc.response.reason_phrase}"
+        except Exception as e:
+            error = f"Error while requesting {url}: {str(e)}"
 
     if feed:
         if feed.bozo and not feed.entries:
             logging.warning("Get feed %s %s", url, feed.get("bozo_exception"))
             error = feed.get("bozo_exception")
 
+    headers = response.headers if response is not None else {}
     return {
         "feed": feed,
-        "xml": response.text if response else "",
+        "xml": response.text if response is not None else "",
         "update": update,
+        "not_modified": response is not None and response.status_code == 304,
+        "etag": headers.get("ETag", ""),
+        "last_modified": headers.get("Last-Modified", ""),
         "error": error,
+        "elapsed": response.elapsed.total_seconds() if response is not None else 0,
     }
 
 
+def feed_fingerprint(feed) -> str:
+    """
+    Fingerprint of a parsed feed built from the entry (id, updated, title) tuples,
+    so volatile parts of the body such as lastBuildDate do not count as a change.
+    """
+    parts = [str(feed.feed.get("title", ""))]
+    for entry in feed.entries:
+        parts.append(
+            "|".join(
+                str(value)
+                for value in (
+                    entry.get("id") or entry.get("link", ""),
+                    entry.get("updated") or entry.get("published", ""),
+                    entry.get("title", ""),
+                )
+            )
+        )
+    return str(cityhash.CityHash64("\n".join(parts)))
+
+
+def fetch_feed(url: str, etag: str = "", last_modified: str = "") -> Dict:
+    response, error = fetcher.get(url, etag, last_modified)
+    return _parse_response(url, response, error)
+
+
+def fetch_feeds(requests: List[Tuple[str, str, str]]) -> List[Dict]:
+    """Fetch several (url, etag, last_modified) tuples concurrently on the shared fetcher, results keep the input order."""
+    results = fetcher.get_many(requests)
+    return [
+        _parse_response(request[0], response, error)
+        for request, (response, error) in zip(requests, results)
+    ]
+
+
 def generate_atom_feed(feed_url: str, feed_dict: dict):
     if not feed_dict:
         logging.error("generate_atom_feed: feed_dict is None")
@@ -0,0 +1,132 @@
+import asyncio
+import importlib.util
+import logging
+import threading
+from collections import defaultdict
+from typing import Dict, Iterable, List, Tuple
+from urllib.parse import urlsplit
+
+import httpx
+from django.conf import settings
+from fake_useragent import UserAgent
+
+
+class FeedFetcher:
+    """
+    Asyncio fetch engine shared by every task in the process.
+
+    One long-lived httpx.AsyncClient keeps connections alive between polls,
+    a global semaphore bounds the number of in-flight requests and a
+    semaphore per host keeps us polite with servers hosting many feeds.
+    The event loop runs in a daemon thread, so the sync callers (huey tasks)
+    simply submit coroutines and wait for the results.
+    """
+
+    def __init__(
+        self,
+        concurrency: int = 20,
+        per_host: int = 4,
+        http2: bool = False,
+        timeout: float = 30,
+    ):
+        self.concurrency = max(1, concurrency)
+        self.per_host = max(1, per_host)
+        self.http2 = http2 and self._http2_available()
+        self.timeout = timeout
+        self._ua = UserAgent()
+        self._loop = None
+        self._client = None
+        self._semaphore = None
+        self._host_semaphores = None
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _http2_available() -> bool:
+        if importlib.util.find_spec("h2") is None:
+            logging.warning("FeedFetcher: HTTP/2 requested but 'h2' is not installed, using HTTP/1.1")
+            return False
+        return True
+
+    def _ensure_loop(self):
+        with self._lock:
+            if self._loop is not None:
+                return self._loop
+            loop = asyncio.new_event_loop()
+            thread = threading.Thread(
+                target=loop.run_forever, name="feed-fetcher", daemon=True
+            )
+            thread.start()
+            asyncio.run_coroutine_threadsafe(self._setup(), loop).result()
+            self._loop = loop
+            return loop
+
+    async def _setup(self):
+        self._client = httpx.AsyncClient(
+            http2=self.http2,
+            timeout=self.timeout,
+            follow_redirects=True,
+            limits=httpx.Limits(
+                max_connections=self.concurrency,
+                max_keepalive_connections=self.concurrency,
+                keepalive_expiry=60,
+            ),
+        )
+        self._semaphore = asyncio.Semaphore(self.concurrency)
+        self._host_semaphores = defaultdict(lambda: asyncio.Semaphore(self.per_host))
+
+    def _headers(self, etag: str = "", last_modified: str = "") -> Dict:
+        headers = {
+            "User-Agent": self._ua.random.strip(),
+            "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,*/*;q=0.8",
+            "Accept-Language": "en-US,en;q=0.5",
+            "Accept-Encoding": "gzip, deflate, br",
+            "Cache-Control": "max-age=0",
+        }
+        if etag:
+            headers["If-None-Match"] = etag
+        if last_modified:
+            headers["If-Modified-Since"] = last_modified
+        return headers
+
+    async def _get(self, url: str, etag: str = "", last_modified: str = ""):
+        host = urlsplit(url).netloc
+        async with self._semaphore, self._host_semaphores[host]:
+            try:
+                response = await self._client.get(
+                    url, headers=self._headers(etag, last_modified)
+                )
+                return response, None
+            except httpx.TimeoutException:
+                return None, f"Timeout while requesting {url}"
+            except Exception as e:
+                return None, f"Error while requesting {url}: {str(e)}"
+
+    async def _get_many(self, requests: List[Tuple[str, str, str]]):
+        return await asyncio.gather(*(self._get(*request) for request in requests))
+
+    def get(self, url: str, etag: str = "", last_modified: str = ""):
+        """Fetch one url, return (response, error)."""
+        return self.get_many([(url, etag, last_modified)])[0]
+
+    def get_many(self, requests: Iterable[Tuple[str, str, str]]):
+        """Fetch (url, etag, last_modified) tuples concurrently, return [(response, error)] in order."""
+        requests = list(requests)
+        if not requests:
+            return []
+        loop = self._ensure_loop()
+        return asyncio.run_coroutine_threadsafe(self._get_many(requests), loop).result()
+
+    def close(self):
+        with self._lock:
+            if self._loop is None:
+                return
+            asyncio.run_coroutine_threadsafe(self._client.aclose(), self._loop).result()
+            self._loop.call_soon_threadsafe(self._loop.stop)
+            self._loop = None
+
+
+fetcher = FeedFetcher(
+    concurrency=settings.FEED_FETCH_CONCURRENCY,
+    per_host=settings.FEED_FETCH_PER_HOST,
+    http2=settings.FEED_FETCH_HTTP2,
+)
@@ -0,0 +1,124 @@
+import html
+import logging
+import re
+import threading
+from collections import Counter, OrderedDict
+from typing import Tuple
+
+from langdetect import DetectorFactory, detect_langs
+
+# langdetect is random by default, a fixed seed gives the same answer for the same text
+DetectorFactory.seed = 0
+
+TAG_PATTERN = re.compile(r"<[^>]*>")
+SPACE_PATTERN = re.compile(r"\s+")
+
+
+class LanguageDetector:
+    """
+    Language detection shared by every task of the process.
+
+    Only a bounded prefix of the text, with the markup stripped, is sampled.
+    Results are cached per entry (id + updated), so the T_Feeds of one feed
+    and the next polls do not detect the same entry again. Each feed keeps a
+    prior of the languages seen so far: once one language clearly dominates,
+    its entries skip detection and are only re-checked every prior_recheck entries.
+    A prior answer is a hint of the source language, not a detection of the entry,
+    so it comes with a probability of 0.0 and is never cached.
+    """
+
+    def __init__(
+        self,
+        sample_chars: int = 1000,
+        cache_size: int = 10000,
+        prior_min_samples: int = 10,
+        prior_share: float = 0.9,
+        prior_recheck: int = 20,
+    ):
+        self.sample_chars = sample_chars
+        self.cache_size = cache_size
+        self.prior_min_samples = prior_min_samples
+        self.prior_share = prior_share
+        self.prior_recheck = prior_recheck
+        self.detections = 0
+        self.cache_hits = 0
+        self.prior_hits = 0
+        self._cache = OrderedDict()
+        self._priors = {}
+        self._lock = threading.Lock()
+
+    def sample(self, text: str) -> str:
+        """Strip the tags of the first part of the text, keep at most sample_chars characters"""
+        text = html.unescape(TAG_PATTERN.sub(" ", text[: self.sample_chars * 4]))
+        return SPACE_PATTERN.sub(" ", text).strip()[: self.sample_chars]
+
+    def detect_text(self, text: str) -> Tuple[str, float]:
+        """Return (language code, probability), ("auto", 0.0) if it cannot be detected"""
+        sample = self.sample(text or "")
+        with self._lock:
+            self.detections += 1
+        try:
+            language = detect_langs(sample)[0]
+            return language.lang, language.prob
+        except Exception as e:
+            logging.warning("Cannot detect source language:%s,%s", e, sample)
+            return "auto", 0.0
+
+    def detect_entry(self, entry, feed_key: str = "", exact: bool = False) -> Tuple[str, float]:
+        """Detect the language of a feedparser entry from its title and content, exact skips the prior"""
+        entry_key = (feed_key, entry.get("id") or entry.get("link"), entry.get("updated"))
+        with self._lock:
+            cached = self._cache.get(entry_key)
+            if cached is not None:
+                self._cache.move_to_end(entry_key)
+                self.cache_hits += 1
+                return cached
+            prior = None if exact else self._prior(feed_key)
+            if prior is not None:
+                self.prior_hits += 1
+                return prior, 0.0
+
+        content = entry.get("content")
+        content = content[0].get("value") if content else entry.get("summary")
+        result = self.detect_text(f"{entry.get('title') or ''}\n{content or ''}")
+
+        with self._lock:
+            self._cache[entry_key] = result
+            while len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+            if feed_key and result[0] != "auto":
+                counts, seen = self._priors.get(feed_key, (Counter(), 0))
+                counts[result[0]] += 1
+                self._priors[feed_key] = (counts, seen)
+        return result
+
+    def _prior(self, feed_key: str):
+        """The dominant language of the feed, None if detection is needed"""
+        if not feed_key or feed_key not in self._priors:
+            return None
+        counts, seen = self._priors[feed_key]
+        total = sum(counts.values())
+        if total < self.prior_min_samples:
+            return None
+        language, count = counts.most_common(1)[0]
+        share = count / total
+        if share < self.prior_share:
+            return None
+        seen += 1
+        self._priors[feed_key] = (counts, seen)
+        if seen % self.prior_recheck == 0:
+            return None  # re-check from time to time, feeds can switch language
+        return language
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "entries": len(self._cache),
+                "feeds": len(self._priors),
+                "detections": self.detections,
+                "cache_hits": self.cache_hits,
+                "prior_hits": self.prior_hits,
+            }
+
+
+language_detector = LanguageDetector()
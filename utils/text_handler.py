@@ -1,108 +1,191 @@
 import logging
 import re
-from typing import List, Tuple, Optional
-from bs4 import Comment
+from functools import lru_cache
+from typing import Callable, List, Tuple, Optional
+import html
 import tiktoken
-import html2text
-from langdetect import detect
-
-def detect_language(entry):
-    title = entry.get("title")
-    original_content = entry.get("content")
-    content = (
-        original_content[0].get("value")
-        if original_content
-        else entry.get("summary")
-    )
-    text =f"{title} {content}"
-    source_language = "auto"
+from lxml import etree
+from lxml import html as lxml_html
+from utils.language_detector import language_detector
+
+# langdetect codes of settings.TRANSLATION_LANGUAGES
+LANGUAGE_CODES = {
+    "English": "en",
+    "Chinese Simplified": "zh-cn",
+    "Chinese Traditional": "zh-tw",
+    "Russian": "ru",
+    "Japanese": "ja",
+    "Korean": "ko",
+    "Czech": "cs",
+    "Danish": "da",
+    "German": "de",
+    "Spanish": "es",
+    "French": "fr",
+    "Indonesian": "id",
+    "Italian": "it",
+    "Hungarian": "hu",
+    "Norwegian Bokmal": "no",
+    "Dutch": "nl",
+    "Polish": "pl",
+    "Portuguese": "pt",
+    "Swedish": "sv",
+    "Turkish": "tr",
+}
+
+
+def detect_language_confidence(entry, feed_key: str = "", exact: bool = False) -> Tuple[str, float]:
+    """
+    Return the detected language code of the entry and its probability.
+    Unless exact, the feed prior may answer instead, with a probability of 0.0.
+    """
+    return language_detector.detect_entry(entry, feed_key, exact)
+
+
+def detect_language(entry, feed_key: str = ""):
+    return detect_language_confidence(entry, feed_key)[0]
+
+
+def is_target_language(language: str, confidence: float, target_language: str, threshold: float) -> bool:
+    """Whether an entry detected as language is already written in target_language"""
+    return confidence >= threshold and LANGUAGE_CODES.get(target_language) == language
+
+
+def parse_html(content: str):
+    """Parse an html fragment once, the tree is shared by the translate and summary stages."""
     try:
-        source_language = detect(text)
-    except Exception as e:
-        logging.warning("Cannot detect source language:%s,%s", e, text)
-    
-    return source_language
-
-
-def clean_content(content: str) -> str:
-    """convert html to markdown without useless tags"""
-    h = html2text.HTML2Text()
-    h.decode_errors = "ignore"
-    h.ignore_links = True
-    h.ignore_images = True
-    h.ignore_tables = True
-    h.ignore_emphasis = True
-    h.single_line_break = True
-    h.no_wrap_links = True
-    h.mark_code = True
-    h.unicode_snob = True
-    h.body_width = 0
-    h.drop_white_space = True
-    h.ignore_mailto_links = True
-
-    # content = h.handle(h.handle(content)) #remove all \n
-    content = h.handle(content)
-    content = re.sub(r"\n\s*\n", "\n", content)
-    return content
+        return lxml_html.fragment_fromstring(content, create_parent="div")
+    except etree.ParserError:  # empty document
+        return lxml_html.Element("div")
+
+
+def serialize_html(root) -> str:
+    """Serialize the children of a tree returned by parse_html()."""
+    return html.escape(root.text or "", quote=False) + "".join(
+        lxml_html.tostring(child, encoding="unicode") for child in root
+    )
+
+
+BLOCK_TAGS = frozenset(
+    [
+        "address",
+        "article",
+        "aside",
+        "blockquote",
+        "br",
+        "dd",
+        "div",
+        "dl",
+        "dt",
+        "figcaption",
+        "figure",
+        "footer",
+        "h1",
+        "h2",
+        "h3",
+        "h4",
+        "h5",
+        "h6",
+        "header",
+        "hr",
+        "li",
+        "ol",
+        "p",
+        "pre",
+        "section",
+        "table",
+        "td",
+        "th",
+        "tr",
+        "ul",
+    ]
+)
+
+
+def html_to_text(root) -> str:
+    """Plain text of a tree, one line per block, without scripts, styles and comments"""
+    parts = [root.text or ""]
+    stack = [(root, iter(root))]
+    while stack:
+        element, children = stack[-1]
+        child = next(children, None)
+        if child is None:
+            stack.pop()
+            if stack:
+                if element.tag in BLOCK_TAGS:
+                    parts.append("\n")
+                parts.append(element.tail or "")
+            continue
+        if isinstance(child.tag, str) and child.tag not in ("script", "style"):
+            if child.tag in BLOCK_TAGS:
+                parts.append("\n")
+            parts.append(child.text or "")
+            stack.append((child, iter(child)))
+        else:
+            parts.append(child.tail or "")
+    return re.sub(r"\n\s*\n", "\n", "".join(parts)).strip()
 
 
 # Thanks to https://github.com/openai/openai-cookbook/blob/main/examples/Summarizing_with_controllable_detail.ipynb
-def tokenize(text: str) -> List[str]:
-    encoding = tiktoken.encoding_for_model("gpt-3.5-turbo")
-    return encoding.encode(text)
+@lru_cache(maxsize=None)
+def get_encoding(model: str = "gpt-3.5-turbo") -> tiktoken.Encoding:
+    return tiktoken.encoding_for_model(model)
+
+
+def tokenize(text: str) -> List[int]:
+    return get_encoding().encode_ordinary(text)
+
 
+def count_tokens(text: str) -> int:
+    return len(tokenize(text))
 
-def combine_chunks_with_no_minimum(
-    chunks: List[str],
-    max_tokens: int,
-    chunk_delimiter="\n",
-    header: Optional[str] = None,
-    add_ellipsis_for_overflow=False,
+
+def split_tokens(text: str, delimiter: str = " ") -> Tuple[List[str], List[int]]:
+    """
+    Split the text on delimiter (kept at the end of each piece) and tokenize
+    every piece once, return the pieces and their token counts.
+    """
+    pieces = text.split(delimiter)
+    pieces = [f"{piece}{delimiter}" for piece in pieces[:-1]] + pieces[-1:]
+    pieces = [piece for piece in pieces if piece]
+    counts = [len(tokens) for tokens in get_encoding().encode_ordinary_batch(pieces)]
+    return pieces, counts
+
+
+def chunk_by_tokens(
+    pieces: List[str], counts: List[int], max_tokens: int
 ) -> Tuple[List[str], List[int]]:
     """
-    This function combines text chunks into larger blocks without exceeding a specified token count.
-    It returns the combined text blocks, their original indices, and the count of chunks dropped due to overflow.
-    """
-    dropped_chunk_count = 0
-    output = []  # list to hold the final combined chunks
-    output_indices = []  # list to hold the indices of the final combined chunks
-    candidate = (
-        [] if header is None else [header]
-    )  # list to hold the current combined chunk candidate
-    candidate_indices = []
-    for chunk_i, chunk in enumerate(chunks):
-        chunk_with_header = [chunk] if header is None else [header, chunk]
-        if len(tokenize(chunk_delimiter.join(chunk_with_header))) > max_tokens:
-            logging.warning("chunk overflow")
-            if (
-                add_ellipsis_for_overflow
-                and len(tokenize(chunk_delimiter.join(candidate + ["..."])))
-                <= max_tokens
-            ):
-                candidate.append("...")
-                dropped_chunk_count += 1
-            continue  # this case would break downstream assumptions
-        # estimate token count with the current chunk added
-        extended_candidate_token_count = len(
-            tokenize(chunk_delimiter.join(candidate + [chunk]))
-        )
-        # If the token count exceeds max_tokens, add the current candidate to output and start a new candidate
-        if extended_candidate_token_count > max_tokens:
-            output.append(chunk_delimiter.join(candidate))
-            output_indices.append(candidate_indices)
-            candidate = chunk_with_header  # re-initialize candidate
-            candidate_indices = [chunk_i]
-        # otherwise keep extending the candidate
-        else:
-            candidate.append(chunk)
-            candidate_indices.append(chunk_i)
-    # add the remaining candidate to output if it's not empty
-    if (header is not None and len(candidate) > 1) or (
-        header is None and len(candidate) > 0
-    ):
-        output.append(chunk_delimiter.join(candidate))
-        output_indices.append(candidate_indices)
-    return output, output_indices, dropped_chunk_count
+    Greedily combine the pieces of split_tokens() into chunks of at most max_tokens,
+    keeping a running token count instead of re-tokenizing each candidate.
+    A piece larger than max_tokens is cut on token boundaries.
+    Return the chunks and their token counts.
+    """
+    max_tokens = max(int(max_tokens), 1)
+    chunks, chunk_counts = [], []
+    candidate, candidate_count = [], 0
+    for piece, count in zip(pieces, counts):
+        if count > max_tokens:
+            logging.warning("chunk overflow, cut a piece of %d tokens", count)
+            if candidate:
+                chunks.append("".join(candidate))
+                chunk_counts.append(candidate_count)
+                candidate, candidate_count = [], 0
+            tokens = tokenize(piece)
+            for i in range(0, len(tokens), max_tokens):
+                window = tokens[i : i + max_tokens]
+                chunks.append(get_encoding().decode(window))
+                chunk_counts.append(len(window))
+            continue
+        if candidate and candidate_count + count > max_tokens:
+            chunks.append("".join(candidate))
+            chunk_counts.append(candidate_count)
+            candidate, candidate_count = [], 0
+        candidate.append(piece)
+        candidate_count += count
+    if candidate:
+        chunks.append("".join(candidate))
+        chunk_counts.append(candidate_count)
+    return chunks, chunk_counts
 
 
 def chunk_on_delimiter(
@@ -111,18 +194,62 @@ def chunk_on_delimiter(
     """
     This function chunks a text into smaller pieces based on a maximum token count and a delimiter.
     """
-    chunks = input_string.split(delimiter)
-    combined_chunks, _, dropped_chunk_count = combine_chunks_with_no_minimum(
-        chunks, max_tokens, chunk_delimiter=delimiter, add_ellipsis_for_overflow=True
-    )
-    if dropped_chunk_count > 0:
-        logging.warning("%d chunks were dropped due to overflow", dropped_chunk_count)
-    combined_chunks = [f"{chunk}{delimiter}" for chunk in combined_chunks]
-    return combined_chunks
+    pieces, counts = split_tokens(input_string, delimiter)
+    return chunk_by_tokens(pieces, counts, max_tokens)[0]
+
 
+SEGMENT_PROMPT = (
+    "The text is made of segments wrapped in <segN></segN> tags. "
+    "Translate every segment separately and return all of them, "
+    "keeping each tag unchanged and in the same order."
+)
+SEGMENT_PATTERN = re.compile(r"<seg(\d+)>(.*?)</seg\1>", re.DOTALL | re.IGNORECASE)
 
-def should_skip(element):
-    skip_tags = [
+
+def pack_segments(
+    texts: List[str],
+    max_size: int,
+    size_fn: Callable[[str], int] = len,
+    max_count: int = 0,
+) -> List[List[int]]:
+    """
+    Greedily group the indices of texts so that each group stays within max_size
+    (and max_count texts, if set). A text larger than max_size gets a group of its own.
+    """
+    groups = []
+    group = []
+    group_size = 0
+    for i, text in enumerate(texts):
+        size = size_fn(text)
+        if group and (
+            group_size + size > max_size or (max_count and len(group) >= max_count)
+        ):
+            groups.append(group)
+            group = []
+            group_size = 0
+        group.append(i)
+        group_size += size
+    if group:
+        groups.append(group)
+    return groups
+
+
+def join_segments(texts: List[str]) -> str:
+    return "\n".join(f"<seg{i}>{text}</seg{i}>" for i, text in enumerate(texts))
+
+
+def split_segments(text: str, count: int) -> Optional[List[str]]:
+    """Map a translated packed text back to its segments, None if the markers did not survive."""
+    segments = {}
+    for match in SEGMENT_PATTERN.finditer(text or ""):
+        segments[int(match.group(1))] = match.group(2).strip()
+    if len(segments) != count or any(not segments.get(i) for i in range(count)):
+        return None
+    return [segments[i] for i in range(count)]
+
+
+SKIP_TAGS = frozenset(
+    [
         "pre",
         "code",
         "script",
@@ -139,54 +266,266 @@ def should_skip(element):
         "dfn",
         "iframe",
     ]
-    if isinstance(element, Comment):
-        return True
-    if element.find_parents(skip_tags):
-        return True
+)
+# 使用正则表达式来检查元素是否为数字、URL、电子邮件或包含特定符号
+SKIP_TEXT_PATTERN = re.compile(
+    r"^(?:"
+    r"http"  # URL
+    r"|[^@]+@[^@]+\.[^@]+$"  # 电子邮件
+    r"|[\d\W]+$"  # 纯数字或者数字和符号的组合
+    r")"
+)
 
-    # check if the element class is katex for MathMl
-    if element.find_parent("span", class_="katex"):
-        return True
 
-    text = element.get_text(strip=True)
-    if not text:
+def _is_skip_tag(element) -> bool:
+    # comments have no string tag, katex spans are MathML
+    if not isinstance(element.tag, str):
         return True
+    return element.tag in SKIP_TAGS or (
+        element.tag == "span" and "katex" in (element.get("class") or "").split()
+    )
 
-    # 使用正则表达式来检查元素是否为数字、URL、电子邮件或包含特定符号
-    skip_patterns = [
-        r"^http",  # URL
-        r"^[^@]+@[^@]+\.[^@]+$",  # 电子邮件
-        r"^[\d\W]+$",  # 纯数字或者数字和符号的组合
-    ]
 
-    for pattern in skip_patterns:
-        if re.match(pattern, text):
-            return True
-
-    return False
-
-
-def unwrap_tags(soup) -> str:
-    tags_to_unwrap = [
-        "i",
-        "a",
-        "strong",
-        "b",
-        "em",
-        "span",
-        "sup",
-        "sub",
-        "mark",
-        "del",
-        "ins",
-        "u",
-        "s",
-        "small",
-    ]
-    for tag_name in tags_to_unwrap:
-        for tag in soup.find_all(tag_name):
-            tag.unwrap()
-    return str(soup)
+def _is_skip_text(text: str) -> bool:
+    text = (text or "").strip()
+    return not text or SKIP_TEXT_PATTERN.match(text) is not None
+
+
+# A text node of an lxml tree is a slot: (element, False) for element.text,
+# (element, True) for element.tail, which belongs to the parent of element.
+def get_slot(slot) -> str:
+    element, tail = slot
+    return (element.tail if tail else element.text) or ""
+
+
+def set_slot(slot, text: str):
+    element, tail = slot
+    if tail:
+        element.tail = text
+    else:
+        element.text = text
+
+
+def iter_translatable(root):
+    """
+    Yield the slots of the text nodes to translate in document order, in a single
+    walk of the tree: skipped tags (code, katex spans...) are not descended into at
+    all, instead of checking the parents of every text node.
+    """
+    if not _is_skip_text(root.text):
+        yield (root, False)
+    stack = [(root, iter(root))]
+    while stack:
+        element, children = stack[-1]
+        child = next(children, None)
+        if child is None:
+            stack.pop()
+            if stack and not _is_skip_text(element.tail):
+                yield (element, True)
+            continue
+        if _is_skip_tag(child):
+            if not _is_skip_text(child.tail):
+                yield (child, True)
+            continue
+        if not _is_skip_text(child.text):
+            yield (child, False)
+        stack.append((child, iter(child)))
+
+
+UNWRAP_TAGS = [
+    "i",
+    "a",
+    "strong",
+    "b",
+    "em",
+    "span",
+    "sup",
+    "sub",
+    "mark",
+    "del",
+    "ins",
+    "u",
+    "s",
+    "small",
+]
+
+
+def unwrap_tags(root):
+    """Drop the inline formatting tags, keeping their text"""
+    etree.strip_tags(root, *UNWRAP_TAGS)
+    return root
+
+
+INLINE_TAGS = frozenset(UNWRAP_TAGS + ["br"])
+INLINE_TAG_PROMPT = (
+    "The text contains placeholder tags such as <g1>, </g1> and <g2/> standing for the original formatting. "
+    "Keep every placeholder tag exactly once, around the translated words it belongs to."
+)
+PLACEHOLDER_PATTERN = re.compile(r"<(/?)g(\d+)\s*(/?)>", re.IGNORECASE)
+
+
+class Segment:
+    """
+    One translation unit: a single text slot, or a run of text and inline elements
+    inside a block, encoded with <gN> placeholders for the inline tags.
+    The run starts with the text of its head slot and ends with the tail of its last element.
+    """
+
+    __slots__ = ("slot", "elements", "tags", "text")
+
+    def __init__(self, slot: tuple, elements: list, tags: list, text: str):
+        self.slot = slot
+        self.elements = elements
+        self.tags = tags
+        self.text = text
+
+
+def _is_inline(element) -> bool:
+    """An inline tag holding only text and inline tags can join a run."""
+    if not isinstance(element.tag, str) or element.tag not in INLINE_TAGS:
+        return False
+    if element.tag == "span" and "katex" in (element.get("class") or "").split():
+        return False
+    return all(_is_inline(child) for child in element)
+
+
+def _encode(element, tags: list) -> str:
+    n = len(tags) + 1
+    tags.append(element)
+    if element.tag == "br":
+        encoded = f"<g{n}/>"
+    else:
+        inner = html.escape(element.text or "", quote=False) + "".join(
+            _encode(child, tags) for child in element
+        )
+        encoded = f"<g{n}>{inner}</g{n}>"
+    return encoded + html.escape(element.tail or "", quote=False)
+
+
+def _run_segment(slot: tuple, run: list) -> Optional[Segment]:
+    head = get_slot(slot)
+    if not run:
+        return None if _is_skip_text(head) else Segment(slot, [], [], head)
+    strings = [head]
+    for element in run:
+        strings.extend(element.itertext())
+        strings.append(element.tail)
+    if all(_is_skip_text(string) for string in strings):
+        return None
+    tags = []
+    text = html.escape(head, quote=False) + "".join(_encode(element, tags) for element in run)
+    return Segment(slot, run, tags, text)
+
+
+def segment_blocks(root, inline: bool = True) -> List[Segment]:
+    """
+    Split the document into translation units. With inline=True, consecutive text
+    and inline tags inside a block become one unit, so a paragraph such as
+    `foo <a>bar</a> baz` is translated in one piece with its link kept.
+    Otherwise (and for engines that cannot keep placeholders) every text node is a unit.
+    """
+    if not inline:
+        return [Segment(slot, [], [], get_slot(slot)) for slot in iter_translatable(root)]
+
+    segments = []
+
+    def flush(slot, run):
+        segment = _run_segment(slot, run)
+        if segment is not None:
+            segments.append(segment)
+
+    def walk(element):
+        slot, run = (element, False), []
+        for child in element:
+            if _is_inline(child):
+                run.append(child)
+                continue
+            flush(slot, run)
+            if not _is_skip_tag(child):
+                walk(child)
+            slot, run = (child, True), []
+        flush(slot, run)
+
+    walk(root)
+    return segments
+
+
+def _decode(segment: Segment, translation: str):
+    """Rebuild a translated run in a scratch element, None if the placeholders did not survive."""
+    scratch = lxml_html.Element("div")
+    stack = [(None, scratch)]
+    used = set()
+    pos = 0
+
+    def add_text(text):
+        container = stack[-1][1]
+        text = html.unescape(text)
+        if len(container):
+            container[-1].tail = (container[-1].tail or "") + text
+        else:
+            container.text = (container.text or "") + text
+
+    for match in PLACEHOLDER_PATTERN.finditer(translation):
+        add_text(translation[pos : match.start()])
+        pos = match.end()
+        closing, n, void = match.group(1), int(match.group(2)), match.group(3)
+        if not 0 < n <= len(segment.tags):
+            return None
+        if closing:
+            if stack[-1][0] != n:
+                return None
+            stack.pop()
+            continue
+        if n in used:
+            return None
+        used.add(n)
+        original = segment.tags[n - 1]
+        element = original.makeelement(original.tag, original.attrib)
+        stack[-1][1].append(element)
+        if not void and element.tag != "br":
+            stack.append((n, element))
+    add_text(translation[pos:])
+    if len(stack) != 1 or len(used) != len(segment.tags):
+        return None
+    return scratch
+
+
+def split_run(segment: Segment) -> List[Segment]:
+    """The text node units of a run, to translate it node by node when its placeholders are lost."""
+    if not segment.elements:
+        return [segment]
+    slots = [] if _is_skip_text(get_slot(segment.slot)) else [segment.slot]
+    for element in segment.elements:
+        slots.extend(iter_translatable(element))
+        if not _is_skip_text(element.tail):
+            slots.append((element, True))
+    return [Segment(slot, [], [], get_slot(slot)) for slot in slots]
+
+
+def restore_segment(segment: Segment, translation: str) -> bool:
+    """
+    Put the translation of a unit back into the tree, with its inline tags.
+    Return False, leaving the tree untouched, if the placeholders did not survive.
+    """
+    if not segment.elements:
+        set_slot(segment.slot, translation)
+        return True
+    # engines tend to strip the whitespace around a run, keep the original one
+    leading = segment.text[: len(segment.text) - len(segment.text.lstrip())]
+    trailing = segment.text[len(segment.text.rstrip()) :]
+    translation = f"{leading}{translation.strip()}{trailing}"
+    scratch = _decode(segment, translation)
+    if scratch is None:
+        return False
+
+    parent = segment.elements[0].getparent()
+    index = parent.index(segment.elements[0])
+    for element in segment.elements:
+        parent.remove(element)  # the tail goes with it, it is part of the run
+    set_slot(segment.slot, scratch.text or "")
+    for offset, element in enumerate(list(scratch)):
+        parent.insert(index + offset, element)
+    return True
 
 
 def set_translation_display(